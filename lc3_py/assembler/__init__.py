@@ -0,0 +1,62 @@
+"""Assembling LC-3 source.
+
+The names below are imported from their modules on first use, so importing the package
+does not compile the lexer or import NumPy, which :class:`Disassembly` requires.
+"""
+import importlib
+import typing as t
+
+if t.TYPE_CHECKING:
+    from .assembler import SymbolTable
+    from .disassembler import Disassembly
+    from .encoder import Program, assemble_lc3
+    from .image import Image
+    from .lexer import lex_lc3
+    from .line_table import LineTable
+    from .object_file import write_image, write_object
+    from .parallel_lexer import lex_lc3_parallel
+    from .parser_old import parse_lc3
+    from .stats import StatsCollector
+
+_LAZY_NAMES = {
+    "assemble_lc3": "encoder",
+    "Program": "encoder",
+    "lex_lc3": "lexer",
+    "lex_lc3_parallel": "parallel_lexer",
+    "parse_lc3": "parser_old",
+    "SymbolTable": "assembler",
+    "Image": "image",
+    "LineTable": "line_table",
+    "write_object": "object_file",
+    "write_image": "object_file",
+    "StatsCollector": "stats",
+    "Disassembly": "disassembler",
+}
+
+__all__ = [
+    "Disassembly",
+    "Image",
+    "LineTable",
+    "Program",
+    "StatsCollector",
+    "SymbolTable",
+    "assemble_lc3",
+    "lex_lc3",
+    "lex_lc3_parallel",
+    "parse_lc3",
+    "write_image",
+    "write_object",
+]
+assert set(__all__) == set(_LAZY_NAMES)
+
+
+def __getattr__(name: str) -> t.Any:
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(importlib.import_module(f".{module}", __name__), name)
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_NAMES})
@@ -1,15 +1,18 @@
+import bisect
 from dataclasses import dataclass
 import enum
-from system_constants import MIN_ADDRESS, MIN_USER_ADDRESS, MAX_ADDRESS
+from lc3_py.system_constants import MIN_ADDRESS, MIN_USER_ADDRESS, MAX_ADDRESS
 import typing as t
 
 from lc3_py.type_additions import Result, Err, ErrList
 
+from .names import canonical
+
 
 class Address:
 
     def __init__(self, address: int):
-        if not (MIN_ADDRESS < address < MAX_ADDRESS):
+        if not (MIN_ADDRESS <= address <= MAX_ADDRESS):
             raise ValueError(f"Invalid address x{address:X}")
         self._address = address
 
@@ -34,16 +37,41 @@ class Address:
 class SymbolTable():
     def __init__(self):
         self._dict: dict[Label, Address] = dict()
+        self._addresses: list[int] = []
+        """The labelled addresses in ascending order, parallel to ``_labels``"""
+        self._labels: list[Label] = []
     def add(self, label: Label, address: Address) -> Result[None, Err]:
         if label in self._dict:
             return Err(f"label '{label.value}' has been defined twice")
         self._dict[label] = address
+        index = bisect.bisect_right(self._addresses, address.value)
+        self._addresses.insert(index, address.value)
+        self._labels.insert(index, label)
     def get_value(self, label: Label) -> Result[Address, Err]:
         return self._dict.get(label, Err(f"undefined label '{label.value}'"))
+    def items(self) -> t.ItemsView[Label, Address]:
+        return self._dict.items()
+    def label_at(self, address: int) -> t.Optional[Label]:
+        """Gets the first label defined at ``address``, if any"""
+        index = bisect.bisect_left(self._addresses, address)
+        if index < len(self._addresses) and self._addresses[index] == address:
+            return self._labels[index]
+        return None
+    def nearest_label(self, address: int) -> t.Optional[tuple[Label, int]]:
+        """Gets the nearest label at or before ``address`` and the distance from it to ``address``.
+
+        Of several labels at that address, this is the one :meth:`label_at` gives.
+        """
+        index = bisect.bisect_right(self._addresses, address) - 1
+        if index < 0:
+            return None
+        labelled = self._addresses[index]
+        return self._labels[bisect.bisect_left(self._addresses, labelled, 0, index)], address - labelled
 
 class Label:
     def __init__(self, label: str):
         self._label = label
+        self._key = canonical(label)
 
     @property
     def value(self) -> str:
@@ -61,9 +89,12 @@ class Label:
         return Label(label)
     
     def __eq__(self, other: t.Any) -> bool:
-        return isinstance(other, Label) and self.value == other.value
+        return isinstance(other, Label) and self._key is other._key
     def __hash__(self):
-        return hash(self.value)
+        return hash(self._key)
+    def __reduce__(self):
+        # Keys compare by identity, so an unpickled label must intern its key again.
+        return Label, (self._label,)
 
     def __str__(self):
         return f"Label({self._label})"
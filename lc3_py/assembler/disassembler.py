@@ -0,0 +1,162 @@
+"""Disassembling whole memory images with NumPy.
+
+A :class:`Disassembly` decodes every field of every word up front with array operations,
+including the sign-extended offsets and the targets of PC-relative instructions.
+:class:`instructions` objects are only built for the words asked for. Listings look each
+word's text up in a table of all 65536 words, built once per process one opcode at a time,
+so rendering a line is a single format with no per-word calls. This module requires NumPy.
+"""
+import typing as t
+
+import numpy as np
+import numpy.typing as npt
+
+from . import instructions as ins
+from .assembler import SymbolTable
+from .n_bit_number import FiveBitSigned, SixBitSigned, EightBitSigned, NineBitSigned, ElevenBitSigned
+
+_REGISTERS = tuple(ins.Register)
+_TRAP_NAMES = {0x20: "GETC", 0x21: "OUT", 0x22: "PUTS", 0x23: "IN", 0x24: "PUTSP", 0x25: "HALT"}
+_PC_RELATIVE = [0x2, 0x3, 0xA, 0xB, 0xE]
+
+_CONDITIONS = ("NOP", "BRp ", "BRz ", "BRzp ", "BRn ", "BRnp ", "BRnz ", "BRnzp ")
+_PC_RELATIVE_NAMES = {0x2: "LD", 0x3: "ST", 0xA: "LDI", 0xB: "STI", 0xE: "LEA"}
+_BLANK_LABEL = " " * 12
+
+_HEX: list[str] = []
+"""``xNNNN`` for every word"""
+_TEXTS: list[str] = []
+"""The instruction text of every word, leaving a PC-relative target to be appended"""
+
+
+def _sign_extend(values: npt.NDArray[np.int32], bits: int) -> npt.NDArray[np.int32]:
+    field = values & ((1 << bits) - 1)
+    return field - ((field & (1 << (bits - 1))) << 1)
+
+
+class Disassembly:
+    def __init__(self, words: npt.ArrayLike, origin: int = 0):
+        """
+        :param words: The words to decode, such as ``Simulator.memory_view()``.
+        :param origin: The address of the first word.
+        """
+        self.origin = origin
+        self.words = np.asarray(words, dtype=np.uint16)
+        values = self.words.astype(np.int32)
+        self.addresses = np.arange(origin, origin + len(values), dtype=np.int32)
+        self.opcodes = values >> 12
+        self.destinations = (values >> 9) & 0x7
+        self.base_registers = (values >> 6) & 0x7
+        self.immediates = _sign_extend(values, 5)
+        self.offsets = _sign_extend(values, 6)
+        self.pc_offsets = np.where(
+            self.opcodes == 0x4, _sign_extend(values, 11), _sign_extend(values, 9))
+        pc_relative = (
+            np.isin(self.opcodes, _PC_RELATIVE)
+            | ((self.opcodes == 0x0) & ((values & 0x0E00) != 0))
+            | ((self.opcodes == 0x4) & ((values & 0x0800) != 0)))
+        self.targets = np.where(pc_relative, (self.addresses + 1 + self.pc_offsets) & 0xFFFF, -1)
+        """The address each PC-relative instruction refers to, or -1"""
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def instruction(self, index: int) -> t.Optional[ins.Instruction]:
+        """Decodes the word at ``index``, or gets None for the reserved opcode"""
+        word = int(self.words[index])
+        opcode = word >> 12
+        destination = _REGISTERS[(word >> 9) & 0x7]
+        base = _REGISTERS[(word >> 6) & 0x7]
+        match opcode:
+            case 0x0:
+                return ins.Br(bool(word & 0x0800), bool(word & 0x0400), bool(word & 0x0200), NineBitSigned(self.pc_offsets[index]))
+            case 0x1 | 0x5:
+                if word & 0x20:
+                    return (ins.AddIm if opcode == 0x1 else ins.AndIm)(destination, base, FiveBitSigned(self.immediates[index]))
+                return (ins.Add if opcode == 0x1 else ins.And)(destination, base, _REGISTERS[word & 0x7])
+            case 0x2:
+                return ins.Ld(destination, NineBitSigned(self.pc_offsets[index]))
+            case 0x3:
+                return ins.St(destination, NineBitSigned(self.pc_offsets[index]))
+            case 0x4:
+                if word & 0x0800:
+                    return ins.Jsr(ElevenBitSigned(self.pc_offsets[index]))
+                return ins.Jsrr(base)
+            case 0x6:
+                return ins.Ldr(destination, base, SixBitSigned(self.offsets[index]))
+            case 0x7:
+                return ins.Str(destination, base, SixBitSigned(self.offsets[index]))
+            case 0x8:
+                return ins.Rti()
+            case 0x9:
+                return ins.Not(destination, base)
+            case 0xA:
+                return ins.Ldi(destination, NineBitSigned(self.pc_offsets[index]))
+            case 0xB:
+                return ins.Sti(destination, NineBitSigned(self.pc_offsets[index]))
+            case 0xC:
+                return ins.Ret() if base == ins.Register.R7 else ins.Jmp(base)
+            case 0xE:
+                return ins.Lea(destination, NineBitSigned(self.pc_offsets[index]))
+            case 0xF:
+                return ins.Trap(EightBitSigned(word & 0xFF))
+        return None
+
+    def listing(self, symbols: t.Optional[SymbolTable] = None) -> list[str]:
+        """Renders one line per word: address, word, label and instruction.
+
+        PC-relative operands are shown as their target's label when ``symbols`` has one,
+        and as the target address otherwise.
+        """
+        names: dict[int, str] = {}
+        if symbols is not None:
+            # Of several labels at one address, the first defined is shown, as label_at does.
+            for label, address in symbols.items():
+                names.setdefault(address.value, label.value)
+        columns = {address: f"{name:<12}" for address, name in names.items()}
+        hexes, texts = _tables()
+        return [
+            f"{hexes[address]}  {hexes[word]}  {columns.get(address, _BLANK_LABEL)}{texts[word]}"
+            + ("" if target < 0 else names.get(target) or hexes[target])
+            for address, word, target in zip(self.addresses.tolist(), self.words.tolist(), self.targets.tolist())]
+
+
+def _tables() -> tuple[list[str], list[str]]:
+    if not _TEXTS:
+        digits = [f"{byte:02X}" for byte in range(0x100)]
+        _HEX.extend(["x" + high + low for high in digits for low in digits])
+        for opcode in range(16):
+            _TEXTS.extend(_opcode_texts(opcode))
+    return _HEX, _TEXTS
+
+
+def _opcode_texts(opcode: int) -> list[str]:
+    """Formats the 4096 words with ``opcode`` by joining the texts of their fields"""
+    registers = [f"R{register}" for register in range(8)]
+    match opcode:
+        case 0x0:
+            return [conditions for conditions in _CONDITIONS for _ in range(0x200)]
+        case 0x1 | 0x5:
+            name = "ADD" if opcode == 0x1 else "AND"
+            operands = [f"{name} {destination}, {base}, " for destination in registers for base in registers]
+            sources = [f"#{(bits & 0x1F) - ((bits & 0x10) << 1)}" if bits & 0x20 else registers[bits & 0x7] for bits in range(0x40)]
+            return [operand + source for operand in operands for source in sources]
+        case 0x2 | 0x3 | 0xA | 0xB | 0xE:
+            return [f"{_PC_RELATIVE_NAMES[opcode]} {register}, " for register in registers for _ in range(0x200)]
+        case 0x4:
+            return [f"JSRR {registers[(bits >> 6) & 0x7]}" for bits in range(0x800)] + ["JSR "] * 0x800
+        case 0x6 | 0x7:
+            name = "LDR" if opcode == 0x6 else "STR"
+            operands = [f"{name} {register}, {base}, #" for register in registers for base in registers]
+            offsets = [str((bits & 0x3F) - ((bits & 0x20) << 1)) for bits in range(0x40)]
+            return [operand + offset for operand in operands for offset in offsets]
+        case 0x8:
+            return ["RTI"] * 0x1000
+        case 0x9:
+            return [f"NOT {destination}, {source}" for destination in registers for source in registers for _ in range(0x40)]
+        case 0xC:
+            jumps = ["RET" if base == "R7" else f"JMP {base}" for base in registers]
+            return [jump for _ in range(8) for jump in jumps for _ in range(0x40)]
+        case 0xF:
+            return [_TRAP_NAMES.get(vector) or f"TRAP x{vector:02X}" for vector in range(0x100)] * 0x10
+    return [".FILL " + word for word in _HEX[opcode << 12:(opcode + 1) << 12]]
@@ -0,0 +1,199 @@
+"""Assembling source into an :class:`Image`: lexing, parsing, symbol resolution and encoding"""
+from collections.abc import Buffer
+import contextlib
+from dataclasses import dataclass
+import typing as t
+
+from lc3_py import lexing
+from lc3_py.system_constants import MIN_USER_ADDRESS
+from lc3_py.type_additions import Err, ErrList, Result, iserr
+
+from . import directives
+from . import instructions as ins
+from . import lexer
+from . import parser_old
+from .assembler import Address, Label, SymbolTable
+from .image import Image
+from .line_table import LineTable
+from .n_bit_number import NineBitSigned, ElevenBitSigned
+
+if t.TYPE_CHECKING:
+    from .stats import StatsCollector
+
+_REGISTER_OPCODES = {ins.Add: 0x1, ins.And: 0x5}
+_IMMEDIATE_OPCODES = {ins.AddIm: 0x1, ins.AndIm: 0x5}
+_PC_OFFSET_OPCODES = {ins.Ld: 0x2, ins.St: 0x3, ins.Ldi: 0xA, ins.Sti: 0xB, ins.Lea: 0xE}
+_BASE_OFFSET_OPCODES = {ins.Ldr: 0x6, ins.Str: 0x7}
+
+
+@dataclass(frozen=True)
+class Program:
+    image: Image
+    symbols: SymbolTable
+    lines: LineTable
+    """Maps the address of every word the source emitted to its line"""
+
+
+def _register(register: ins.Register) -> int:
+    return int(register.value[1])
+
+
+def _size(statement: parser_old.ParseTokens) -> int:
+    match statement:
+        case ins.Label():
+            return 0
+        case directives.Blkw():
+            return statement.number
+        case directives.Stringz():
+            return len(statement.string) + 1
+    return 1
+
+
+def encode(statement: ins.Instruction) -> int:
+    """Encodes an instruction whose operands have already been range checked"""
+    match statement:
+        case ins.Add() | ins.And():
+            return (_REGISTER_OPCODES[type(statement)] << 12 | _register(statement.destination) << 9
+                    | _register(statement.operand_1) << 6 | _register(statement.operand_2))
+        case ins.AddIm() | ins.AndIm():
+            return (_IMMEDIATE_OPCODES[type(statement)] << 12 | _register(statement.destination) << 9
+                    | _register(statement.operand_1) << 6 | 0x20 | statement.operand_2 & 0x1F)
+        case ins.Br():
+            return statement.n << 11 | statement.z << 10 | statement.p << 9 | statement.pc_offset & 0x1FF
+        case ins.Jmp():
+            return 0xC000 | _register(statement.base_register) << 6
+        case ins.Jsr():
+            return 0x4800 | statement.pc_offset & 0x7FF
+        case ins.Jsrr():
+            return 0x4000 | _register(statement.base_register) << 6
+        case ins.Ld() | ins.Ldi() | ins.Lea():
+            return _PC_OFFSET_OPCODES[type(statement)] << 12 | _register(statement.destination) << 9 | statement.pc_offset & 0x1FF
+        case ins.St() | ins.Sti():
+            return _PC_OFFSET_OPCODES[type(statement)] << 12 | _register(statement.source) << 9 | statement.pc_offset & 0x1FF
+        case ins.Ldr():
+            return 0x6000 | _register(statement.destination) << 9 | _register(statement.base_register) << 6 | statement.offset & 0x3F
+        case ins.Str():
+            return 0x7000 | _register(statement.source) << 9 | _register(statement.base_register) << 6 | statement.offset & 0x3F
+        case ins.Not():
+            return 0x903F | _register(statement.destination) << 9 | _register(statement.source) << 6
+        case ins.Ret():
+            return 0xC1C0
+        case ins.Rti():
+            return 0x8000
+        case ins.Trap():
+            return 0xF000 | statement.vector & 0xFF
+
+
+def resolve(statement: ins.InstructionWithLabel, address: int, symbols: SymbolTable) -> Result[ins.Instruction, Err]:
+    """Replaces the label ``statement`` refers to with the offset to it from ``address``"""
+    assert not isinstance(statement, ins.Label)
+    target = symbols.get_value(Label(statement.label.value))
+    if iserr(target):
+        return target
+    offset = target.value - (address + 1)
+    if isinstance(statement, ins.LabelJsr):
+        long_offset = ElevenBitSigned.new(offset)
+        if iserr(long_offset):
+            return Err(f"'{statement.label.value}' is too far away: {long_offset.error}")
+        return ins.Jsr(long_offset)
+    pc_offset = NineBitSigned.new(offset)
+    if iserr(pc_offset):
+        return Err(f"'{statement.label.value}' is too far away: {pc_offset.error}")
+    match statement:
+        case ins.LabelBr():
+            return ins.Br(statement.n, statement.z, statement.p, pc_offset)
+        case ins.LabelLd():
+            return ins.Ld(statement.destination, pc_offset)
+        case ins.LabelLdi():
+            return ins.Ldi(statement.destination, pc_offset)
+        case ins.LabelLea():
+            return ins.Lea(statement.destination, pc_offset)
+        case ins.LabelSt():
+            return ins.St(statement.source, pc_offset)
+        case ins.LabelSti():
+            return ins.Sti(statement.source, pc_offset)
+
+
+def assemble_lc3(
+        source: str | Buffer,
+        *,
+        origin: int = MIN_USER_ADDRESS,
+        stats: t.Optional[StatsCollector] = None) -> Result[Program, ErrList]:
+    """Assembles ``source`` to be loaded at ``origin``.
+
+    ``source`` may also be UTF-8 in any buffer, such as an ``mmap``, which is lexed in place
+    with :func:`lexer.lex_lc3_bytes`; the spans of any errors are then in bytes.
+
+    :param stats: If given, records statistics for the ``lex``, ``parse``, ``symbols`` and
+        ``encode`` phases.
+    """
+    def phase(name: str) -> t.ContextManager[t.Any]:
+        return stats.phase(name) if stats is not None else contextlib.nullcontext()
+
+    with phase("lex") as lex_stats:
+        if isinstance(source, str):
+            lexeme_matches = lexer.lex_lc3(source, stats=lex_stats)
+        else:
+            lexeme_matches = lexer.lex_lc3_bytes(source, stats=lex_stats)
+    if iserr(lexeme_matches):
+        return lexeme_matches.errors
+
+    with phase("parse") as parse_stats:
+        statements = parser_old.parse_lexemes(lexeme_matches, stats=parse_stats)
+    if iserr(statements):
+        return statements
+
+    errors = ErrList("the program could not be assembled")
+    image = Image()
+    if iserr(started := image.orig(origin)):
+        errors.append(started)
+        return errors
+
+    with phase("symbols") as symbol_stats:
+        symbols = SymbolTable()
+        address = origin
+        for statement in statements:
+            if isinstance(statement.lexeme, ins.Label):
+                location = Address.system(address)
+                added = location if iserr(location) else symbols.add(Label(statement.lexeme.value), location)
+                if iserr(added):
+                    errors.append(lexing.ErrMatch(added.error, parser_old.source_span(lexeme_matches, statement.span)))
+            address += _size(statement.lexeme)
+        if symbol_stats is not None:
+            symbol_stats.items += len(symbols.items())
+
+    with phase("encode") as encode_stats:
+        lines = LineTable()
+        line = 1
+        counted = 0
+        address = origin
+        for statement in statements:
+            while counted < statement.span.start:
+                if isinstance(lexeme := lexeme_matches[counted].lexeme, lexer.Newline):
+                    line += lexeme.number
+                counted += 1
+            instruction = statement.lexeme
+            lines.add(address, line, count=_size(instruction))
+            match instruction:
+                case ins.Label():
+                    continue
+                case directives.Blkw():
+                    emitted = image.reserve(instruction.number)
+                case directives.Stringz():
+                    emitted = image.extend([*map(ord, instruction.string), 0])
+                case directives.Fill():
+                    emitted = image.fill(instruction.data & 0xFFFF)
+                case ins.LabelBr() | ins.LabelJsr() | ins.LabelLd() | ins.LabelLdi() | ins.LabelLea() | ins.LabelSt() | ins.LabelSti():
+                    resolved = resolve(instruction, address, symbols)
+                    emitted = resolved if iserr(resolved) else image.fill(encode(resolved))
+                case _:
+                    emitted = image.fill(encode(instruction))
+            if iserr(emitted):
+                errors.append(lexing.ErrMatch(emitted.error, parser_old.source_span(lexeme_matches, statement.span)))
+            address += _size(instruction)
+        if encode_stats is not None:
+            encode_stats.items += address - origin
+
+    if errors:
+        return errors
+    return Program(image, symbols, lines)
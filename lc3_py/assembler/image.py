@@ -0,0 +1,75 @@
+"""The assembler's output: a sparse list of segments rather than a 64K-word image.
+
+Each segment is an origin, the words assembled there, and a number of reserved zero
+words following them. ``.BLKW`` only grows the reserved length of the current segment,
+so a large buffer costs nothing until something is written after it.
+"""
+import array
+from dataclasses import dataclass, field
+import typing as t
+
+from lc3_py.system_constants import MAX_ADDRESS
+from lc3_py.type_additions import Err, Result
+
+_MEMORY_SIZE = MAX_ADDRESS + 1
+
+
+@dataclass
+class Segment:
+    origin: int
+    words: array.array[int] = field(default_factory=lambda: array.array("H"))
+    reserved: int = 0
+    """The number of zero words following :attr:`words`"""
+
+    @property
+    def end(self) -> int:
+        """The address after the segment's last word"""
+        return self.origin + len(self.words) + self.reserved
+
+
+class Image:
+    def __init__(self):
+        self.segments: list[Segment] = []
+
+    def orig(self, origin: int) -> Result[None, Err]:
+        """Starts a new block at ``origin``, as ``.ORIG`` does"""
+        if not 0 <= origin <= MAX_ADDRESS:
+            return Err(f"invalid origin: x{origin:X}")
+        self.segments.append(Segment(origin))
+
+    def fill(self, word: int) -> Result[None, Err]:
+        return self.extend([word])
+
+    def extend(self, words: t.Sequence[int]) -> Result[None, Err]:
+        segment = self._current(len(words))
+        if isinstance(segment, Err):
+            return segment
+        if segment.reserved:
+            segment = Segment(segment.end)
+            self.segments.append(segment)
+        segment.words.extend(words)
+
+    def reserve(self, count: int) -> Result[None, Err]:
+        """Reserves ``count`` zero words, as ``.BLKW`` does"""
+        segment = self._current(count)
+        if isinstance(segment, Err):
+            return segment
+        segment.reserved += count
+
+    def blocks(self) -> list[list[Segment]]:
+        """Groups the segments into runs that each cover one contiguous address range"""
+        blocks: list[list[Segment]] = []
+        for segment in self.segments:
+            if blocks and blocks[-1][-1].end == segment.origin:
+                blocks[-1].append(segment)
+            else:
+                blocks.append([segment])
+        return blocks
+
+    def _current(self, count: int) -> Result[Segment, Err]:
+        if not self.segments:
+            return Err("no .ORIG before the first word")
+        segment = self.segments[-1]
+        if segment.end + count > _MEMORY_SIZE:
+            return Err(f"block starting at x{segment.origin:X} extends past the end of memory")
+        return segment
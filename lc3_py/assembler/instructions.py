@@ -1,8 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import enum
 import typing as t
 
 from lc3_py.type_additions import Err
+from lc3_py.assembler.names import RESERVED_WORDS, canonical
 from lc3_py.assembler.n_bit_number import FiveBitSigned, SixBitSigned, EightBitSigned, NineBitSigned, ElevenBitSigned
 
 class Register(enum.StrEnum):
@@ -124,20 +125,29 @@ class Trap:
 @dataclass(frozen=True)
 class Label:
     value: str
+    key: str = field(init=False, repr=False, compare=False)
+    """The interned, case-folded value, by which labels compare and hash"""
+
+    def __post_init__(self):
+        object.__setattr__(self, "key", canonical(self.value))
 
     @staticmethod
     def new(value: str) -> Label | Err:
         if any([v.isspace() for v in value]):
             return Err("a label cannot contain whitespace")
         
-        if value.lower() in ["add", "and", "br", "jmp", "jsr", "jsrr", "ld", "ldi", "ldr", "lea", "not", "ret", "rti", "sti", "str", "trap", "puts", "out"]:
+        label = Label(value)
+        if label.key in RESERVED_WORDS:
             return Err(f"'{value}' is not a valid label name because it is also an instruction name")
-        return Label(value)
+        return label
     
     def __eq__(self, other: t.Any):
-        return isinstance(other, Label) and self.value.lower() == other.value.lower()
+        return isinstance(other, Label) and self.key is other.key
     def __hash__(self):
-        return hash(self.value.lower())
+        return hash(self.key)
+    def __reduce__(self):
+        # Keys compare by identity, so an unpickled label must intern its key again.
+        return Label, (self.value,)
 
 @dataclass(frozen=True)
 class LabelBr:
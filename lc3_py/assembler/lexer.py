@@ -1,9 +1,16 @@
-from dataclasses import dataclass
+from collections.abc import Buffer
+from dataclasses import dataclass, field
+import sys
 import typing as t
 
-from lc3_py.type_additions import Err
+from lc3_py.type_additions import Err, iserr
 import lc3_py.lexing as lexing
 
+from .names import canonical
+
+if t.TYPE_CHECKING:
+    from .stats import PhaseStats
+
 @dataclass(frozen=True)
 class Newline:
     number: int
@@ -11,11 +18,19 @@ class Newline:
 @dataclass(frozen=True)
 class Word:
     value: str
+    key: str = field(init=False, repr=False, compare=False)
+    """The interned, case-folded value, by which words compare and hash"""
+
+    def __post_init__(self):
+        object.__setattr__(self, "key", canonical(self.value))
 
     def __eq__(self, other: t.Any):
-        return isinstance(other, Word) and self.value.lower() == other.value.lower()
+        return isinstance(other, Word) and self.key is other.key
     def __hash__(self):
-        return hash(self.value.lower())
+        return hash(self.key)
+    def __reduce__(self):
+        # Unpickled words, such as those lexed by workers, are the shared ones.
+        return _word, (self.value,)
 
 @dataclass(frozen=True)
 class DotWord:
@@ -44,28 +59,90 @@ class InvalidLexeme(Err):
         return self._value
 
 
+_words: dict[str, Word] = {}
+_MAX_WORDS = 8192
+"""The cache is emptied when it reaches this size, so lexing many distinct names cannot grow it without bound"""
+
+def _word(value: str) -> Word:
+    """Gets the shared :class:`Word` for ``value``"""
+    word = _words.get(value)
+    if word is None:
+        if len(_words) >= _MAX_WORDS:
+            _words.clear()
+        word = _words[value] = Word(sys.intern(value))
+    return word
+
+
 _lex_table: lexing.StringRegexMapping[Lexeme] = {
     r"[\n\r][\s\n\r]*": lambda g: Newline(g[0].count("\n")),
-    r"[#xX]\d+": lambda g: Integer(int(g[0][1:], 10 if g[0] == "#" else 16), g[0]),
+    r"(?:#-?\d+|[xX]-?[\da-fA-F]+)(?![^\s,])": lambda g: Integer(int(g[0][1:], 10 if g[0][0] == "#" else 16), g[0]),
     r"\.[^\s,]+": lambda g: DotWord(g[0][1:]),
     r'".*"': lambda g: g[0][1:-1],
     r"'.*'": lambda g: Char(g[0][1:-1]),
     r";[^\n\r]*": lambda g: Comment(g[0][1:]),
-    r"[^\d\s,][^\s,]*": lambda g: Word(g[0]),
+    r"[^\d\s,][^\s,]*": lambda g: _word(g[0]),
     r"\S*": lambda g: InvalidLexeme(g[0])
 }
 
-_match_functions = lexing.get_match_functions_from_regex(_lex_table)
+_match_functions: t.Optional[t.Sequence[lexing.MatchFunction[str, Lexeme]]] = None
+_byte_match_functions: t.Optional[t.Sequence[lexing.MatchFunction[int, Lexeme]]] = None
+
+def _get_match_functions() -> t.Sequence[lexing.MatchFunction[str, Lexeme]]:
+    """Compiles :data:`_lex_table` on first use rather than at import"""
+    global _match_functions
+    if _match_functions is None:
+        _match_functions = lexing.get_match_functions_from_regex(_lex_table)
+    return _match_functions
+
+def _get_byte_match_functions() -> t.Sequence[lexing.MatchFunction[int, Lexeme]]:
+    global _byte_match_functions
+    if _byte_match_functions is None:
+        _byte_match_functions = lexing.get_match_functions_from_bytes_regex(_lex_table)
+    return _byte_match_functions
 
 Lexeme: t.TypeAlias =  Newline | Word | DotWord | Integer | str | Char | Comment
 
 _skip_chars = ",\t "
+_skip_bytes = b",\t "
 
 def _skip_function(input_sequence: t.Sequence[str], position: int):
     while position < len(input_sequence) and input_sequence[position] in _skip_chars:
         position += 1
     return position
 
+def _skip_bytes_function(input_sequence: t.Sequence[int], position: int):
+    while position < len(input_sequence) and input_sequence[position] in _skip_bytes:
+        position += 1
+    return position
+
 
-def lex_lc3(source: str) -> t.Sequence[lexing.Match[Lexeme]] | lexing.InvalidSequence[Lexeme]:
-    return lexing.lex(source, _match_functions, _skip_function)
\ No newline at end of file
+def lex_lc3(source: str, *, stats: t.Optional[PhaseStats] = None) -> t.Sequence[lexing.Match[Lexeme]] | lexing.InvalidSequence[Lexeme]:
+    """
+    :param stats: If given, counts the lexemes and the calls to each match function.
+    """
+    if stats is None:
+        return lexing.lex(source, _get_match_functions(), _skip_function)
+    from .stats import counted
+    matches = lexing.lex(source, counted(_get_match_functions(), stats), _skip_function)
+    stats.items += len(matches.matches if iserr(matches) else matches)
+    return matches
+
+
+def lex_lc3_bytes(source: Buffer, *, stats: t.Optional[PhaseStats] = None) -> t.Sequence[lexing.Match[Lexeme]] | lexing.InvalidSequence[Lexeme]:
+    """Lexes UTF-8 source from any buffer, such as ``bytes`` or an ``mmap``, without decoding all of it.
+
+    Spans are in bytes rather than characters. Whitespace is only what ``\\s`` matches in a
+    bytes pattern, but otherwise the lexemes are those :func:`lex_lc3` gets from the decoded
+    source.
+
+    :param stats: If given, counts the lexemes and the calls to each match function.
+    """
+    match_functions = _get_byte_match_functions()
+    if stats is not None:
+        from .stats import counted
+        match_functions = counted(match_functions, stats)
+    with memoryview(source) as view, view.cast("B") as data:
+        matches = lexing.lex(data, match_functions, _skip_bytes_function)
+    if stats is not None:
+        stats.items += len(matches.matches if iserr(matches) else matches)
+    return matches
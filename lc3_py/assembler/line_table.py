@@ -0,0 +1,117 @@
+"""A source map from assembled addresses back to the lines that produced them.
+
+Like a DWARF line table, rows are run-length encoded: each row maps a range of
+consecutive addresses to one file and line, so a ``.BLKW`` or ``.STRINGZ`` costs one
+row. The rows live in parallel arrays and are saved in a small binary file
+(conventionally ``.lines``) that sits next to the ``.obj``.
+"""
+import array
+import bisect
+import struct
+import sys
+import typing as t
+
+_MAGIC = b"LC3L"
+
+
+class LineTable(t.Mapping[int, int]):
+    """Maps addresses to source line numbers; :meth:`source` also gives the file"""
+    def __init__(self):
+        self.files: list[str] = []
+        self._file_indices: dict[str, int] = {}
+        self._starts = array.array("I")
+        self._ends = array.array("I")
+        self._files = array.array("H")
+        self._lines = array.array("I")
+        self._sorted = True
+
+    def add(self, address: int, line: int, file: str = "", count: int = 1):
+        """Maps the ``count`` addresses from ``address`` to ``line`` of ``file``"""
+        if count <= 0:
+            return
+        file_index = self._file_indices.get(file)
+        if file_index is None:
+            file_index = self._file_indices[file] = len(self.files)
+            self.files.append(file)
+        if (self._starts and self._ends[-1] == address
+                and self._files[-1] == file_index and self._lines[-1] == line):
+            self._ends[-1] += count
+            return
+        if self._starts and address < self._starts[-1]:
+            self._sorted = False
+        self._starts.append(address)
+        self._ends.append(address + count)
+        self._files.append(file_index)
+        self._lines.append(line)
+
+    def source(self, address: int) -> t.Optional[tuple[str, int]]:
+        """Gets the file and line that produced ``address``, if any"""
+        row = self._row(address)
+        if row is None:
+            return None
+        return self.files[self._files[row]], self._lines[row]
+
+    @property
+    def row_count(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, address: int) -> int:
+        row = self._row(address)
+        if row is None:
+            raise KeyError(address)
+        return self._lines[row]
+
+    def __iter__(self) -> t.Iterator[int]:
+        self._sort()
+        for start, end in zip(self._starts, self._ends):
+            yield from range(start, end)
+
+    def __len__(self) -> int:
+        return sum(self._ends) - sum(self._starts)
+
+    def _row(self, address: int) -> t.Optional[int]:
+        self._sort()
+        row = bisect.bisect_right(self._starts, address) - 1
+        if row < 0 or address >= self._ends[row]:
+            return None
+        return row
+
+    def _sort(self):
+        if self._sorted:
+            return
+        order = sorted(range(len(self._starts)), key=self._starts.__getitem__)
+        for rows in (self._starts, self._ends, self._files, self._lines):
+            rows[:] = array.array(rows.typecode, [rows[row] for row in order])
+        self._sorted = True
+
+    def write(self, file: t.BinaryIO):
+        """Writes the table in little-endian byte order"""
+        self._sort()
+        file.write(_MAGIC + struct.pack("<I", len(self.files)))
+        for name in self.files:
+            encoded = name.encode("utf-8")
+            file.write(struct.pack("<H", len(encoded)) + encoded)
+        file.write(struct.pack("<I", len(self._starts)))
+        for rows in (self._starts, self._ends, self._files, self._lines):
+            if sys.byteorder == "big":
+                rows = array.array(rows.typecode, rows)
+                rows.byteswap()
+            file.write(rows)
+
+    @staticmethod
+    def read(file: t.BinaryIO) -> LineTable:
+        if file.read(4) != _MAGIC:
+            raise ValueError("not a line table")
+        table = LineTable()
+        (file_count,) = struct.unpack("<I", file.read(4))
+        for _ in range(file_count):
+            (length,) = struct.unpack("<H", file.read(2))
+            name = file.read(length).decode("utf-8")
+            table._file_indices[name] = len(table.files)
+            table.files.append(name)
+        (row_count,) = struct.unpack("<I", file.read(4))
+        for rows in (table._starts, table._ends, table._files, table._lines):
+            rows.frombytes(file.read(row_count * rows.itemsize))
+            if sys.byteorder == "big":
+                rows.byteswap()
+        return table
@@ -0,0 +1,16 @@
+"""Case-folded, interned names shared by the lexer, the parser and symbol tables.
+
+Names are folded to lower case and interned once, when they are created, so comparing
+and hashing them later costs no allocation.
+"""
+import sys
+
+RESERVED_WORDS = frozenset([
+    "add", "and", "br", "jmp", "jsr", "jsrr", "ld", "ldi", "ldr", "lea", "not", "ret",
+    "rti", "sti", "str", "trap", "puts", "out"])
+"""Names that cannot be used as labels because they are instruction names"""
+
+
+def canonical(name: str) -> str:
+    """Gets the interned, case-folded form of ``name``"""
+    return sys.intern(name.lower())
@@ -0,0 +1,33 @@
+"""Writing LC-3 ``.obj`` files: a big-endian origin word followed by big-endian words"""
+import array
+import sys
+import typing as t
+
+from .image import Image
+
+
+def write_object(file: t.BinaryIO, origin: int, words: t.Iterable[int]):
+    """Writes an image loaded at ``origin`` to ``file`` in one write"""
+    image = array.array("H", [origin])
+    image.extend(words)
+    if sys.byteorder == "little":
+        image.byteswap()
+    file.write(image)
+
+
+def write_image(file: t.BinaryIO, image: Image):
+    """Writes ``image``, segment by segment, as one ``.obj`` file.
+
+    An object file covers one contiguous range, so ``image`` must be a single block.
+    """
+    blocks = image.blocks()
+    if len(blocks) != 1:
+        raise ValueError(f"an object file holds one contiguous block, not {len(blocks)}")
+    file.write(blocks[0][0].origin.to_bytes(2, "big"))
+    for segment in blocks[0]:
+        words = segment.words
+        if sys.byteorder == "little":
+            words = array.array("H", words)
+            words.byteswap()
+        file.write(words)
+        file.write(bytes(2 * segment.reserved))
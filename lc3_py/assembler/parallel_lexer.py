@@ -0,0 +1,78 @@
+"""Lexing very large sources across a process pool.
+
+No lexeme contains a newline except :class:`lexer.Newline`, which stands for a run of
+whitespace that begins with one. Such a run ends at the first character that is not
+whitespace, so :func:`lexer.lex_lc3` starts a fresh lexeme just after any newline that
+is followed by such a character. The source is cut there into chunks, the chunks are
+lexed by workers, and the spans are shifted by each chunk's offset.
+"""
+import multiprocessing
+import os
+import re
+import typing as t
+
+from lc3_py import lexing
+from lc3_py.type_additions import has_no_err, iserr
+
+from . import lexer
+
+_CUT = re.compile(r"\n(?=\S)")
+
+
+def chunk_starts(source: str, chunk_size: int) -> list[int]:
+    """Gets the offsets at which to cut ``source`` into chunks of at least ``chunk_size`` characters"""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    starts = [0]
+    while (cut := _CUT.search(source, starts[-1] + chunk_size - 1)) is not None:
+        starts.append(cut.end())
+    return starts
+
+
+def _shift(match: lexing.Match[lexer.Lexeme] | lexing.ErrMatch, offset: int) -> lexing.Match[lexer.Lexeme] | lexing.ErrMatch:
+    span = lexing.Span(match.span.start + offset, match.span.end + offset)
+    if isinstance(match, lexing.ErrMatch):
+        return lexing.ErrMatch(match.error, span)
+    return lexing.Match(match.lexeme, span)
+
+
+def _lex_chunk(chunk: tuple[str, int]) -> tuple[list[lexing.Match[lexer.Lexeme] | lexing.ErrMatch], bool]:
+    """Lexes a chunk, also getting whether lexing stopped because nothing matched"""
+    text, offset = chunk
+    matches = lexer.lex_lc3(text)
+    if not iserr(matches):
+        return [_shift(match, offset) for match in matches] if offset else list(matches), False
+    last = matches.matches[-1]
+    stopped = isinstance(last, lexing.ErrMatch) and last.error == lexing.UNEXPECTED_INPUT
+    return [_shift(match, offset) for match in matches.matches] if offset else matches.matches, stopped
+
+
+def _get_context():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def lex_lc3_parallel(
+        source: str,
+        *,
+        processes: t.Optional[int] = None,
+        chunk_size: int = 1 << 14) -> t.Sequence[lexing.Match[lexer.Lexeme]] | lexing.InvalidSequence[lexer.Lexeme]:
+    """Lexes ``source`` exactly as :func:`lexer.lex_lc3` does, in chunks across a process pool.
+
+    :param processes: The number of workers; defaults to the number of CPUs.
+    :param chunk_size: The least number of characters in each chunk but the last.
+    """
+    starts = chunk_starts(source, chunk_size)
+    if len(starts) == 1:
+        return lexer.lex_lc3(source)
+    chunks = ((source[start:end], start) for start, end in zip(starts, [*starts[1:], len(source)]))
+    merged: list[lexing.Match[lexer.Lexeme] | lexing.ErrMatch] = []
+    with _get_context().Pool(min(processes or os.cpu_count() or 1, len(starts))) as pool:
+        for matches, stopped in pool.imap(_lex_chunk, chunks):
+            merged.extend(matches)
+            if stopped:
+                break
+    if has_no_err(merged):
+        return merged
+    return lexing.InvalidSequence(merged)
@@ -14,7 +14,20 @@ def string(string: str):
 space = p.regex("^[ \t]")
 
 register = p.regex(r"^[rR][0-7]").map(inst.Register)
-immediate = p.regex_groups(r"#(-?\d+)").map(lambda x: int(x[0])) |  p.regex_groups(r"x(-?\d+)").map(lambda x: int(x[0], 16))
+# Functions passed to ``map`` are defined at module level so that the grammar pickles.
+def decimal(groups: tuple[str, ...]) -> int:
+    return int(groups[0])
+
+def hexadecimal(groups: tuple[str, ...]) -> int:
+    return int(groups[0], 16)
+
+def add_registers(parts: tuple[str, inst.Register, inst.Register, inst.Register]) -> inst.Add:
+    return inst.Add(*parts[1:])
+
+def add_immediate(parts: tuple[str, inst.Register, inst.Register, t.Any]) -> inst.AddIm:
+    return inst.AddIm(*parts[1:])
+
+immediate = p.regex_groups(r"#(-?\d+)").map(decimal) |  p.regex_groups(r"x(-?\d+)").map(hexadecimal)
 
 add = (string("add")
        .consume(space)
@@ -23,7 +36,7 @@ add = (string("add")
        .append(register)
        .consume(space)
        .append(register)
-       .map(lambda x: inst.Add(*x[1:])))
+       .map(add_registers))
 
 add = (string("add")
        .consume(space)
@@ -32,7 +45,7 @@ add = (string("add")
        .append(register)
        .consume(space)
        .append(immediate.map(n_bit_number.FiveBitSigned.new))
-       .map(lambda x: inst.AddIm(*x[1:])))
+       .map(add_immediate))
 
 # and_ = string("and")
 # br = p.regex("^[bB][rR][nN]?[zZ]?[pP]?")
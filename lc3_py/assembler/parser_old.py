@@ -1,12 +1,18 @@
+from collections.abc import Buffer
+import functools
 import typing as t
 
-from lc3_py.type_additions import iserr, Err, has_no_err
+from lc3_py.type_additions import iserr, Err, ErrList, has_no_err
 from lc3_py import lexing
 
 from . import lexer
 from . import n_bit_number
 from . import instructions
 from . import directives
+from .names import canonical
+
+if t.TYPE_CHECKING:
+    from .stats import PhaseStats
 
 class StatementWithLabel:
     labels: list[str]
@@ -14,6 +20,9 @@ class StatementWithLabel:
 
 ParseTokens: t.TypeAlias = instructions.InstructionWithLabel | instructions.InstructionWithoutPcOffset | directives.Fill | directives.Blkw | directives.Stringz
 
+_STATEMENT_WINDOW = 16
+"""More lexemes than any statement spans, so parse functions see a short slice from their position"""
+
 @t.overload
 def match[T](lexemes: t.Sequence[t.Any], l1: t.Type[T], /) -> t.TypeGuard[tuple[T]]: ...
 @t.overload
@@ -32,8 +41,9 @@ def match(lexemes: t.Sequence[t.Any], /, *args: t.Type[t.Any]) -> bool:
 
 
 def cut_beginning(f: t.Callable[[t.Sequence[lexer.Lexeme]], t.Optional[tuple[ParseTokens | Err, int]]]) -> t.Callable[[t.Sequence[lexer.Lexeme], int], t.Optional[lexing.Match[ParseTokens] | lexing.ErrMatch]]:
+    @functools.wraps(f)
     def wrapped(seq: t.Sequence[lexer.Lexeme], pos: int) -> t.Optional[lexing.Match[ParseTokens] | lexing.ErrMatch]:
-        r = f(seq)
+        r = f(seq[pos:pos + _STATEMENT_WINDOW])
         if r is None:
             return None
         obj, length = r
@@ -44,9 +54,11 @@ def cut_beginning(f: t.Callable[[t.Sequence[lexer.Lexeme]], t.Optional[tuple[Par
     return wrapped
 
 def begins(word_value: str):
+    key = canonical(word_value)
     def wrapper(f: t.Callable[[t.Sequence[lexer.Lexeme]], tuple[ParseTokens | Err, int]]) -> t.Callable[[t.Sequence[lexer.Lexeme]], t.Optional[tuple[ParseTokens | Err, int]]]:
+        @functools.wraps(f)
         def wrapped(seq: t.Sequence[lexer.Lexeme]):
-            if len(seq) > 0 and isinstance(seq[0], lexer.Word) and seq[0].value.lower() == word_value.lower():
+            if len(seq) > 0 and isinstance(seq[0], lexer.Word) and seq[0].key is key:
                 obj, length = f(seq[1:])
                 if iserr(obj):
                     return Err(f"invalid '{word_value}': {obj.error}"), length + 1
@@ -57,6 +69,7 @@ def begins(word_value: str):
 
 
 def ends_with_newline(f: t.Callable[[t.Sequence[lexer.Lexeme]], tuple[ParseTokens | Err, int]]) -> t.Callable[[t.Sequence[lexer.Lexeme]], tuple[ParseTokens | Err, int]]:
+    @functools.wraps(f)
     def wrapped(seq: t.Sequence[lexer.Lexeme]):
         obj, length = f(seq)
         if iserr(obj):
@@ -108,7 +121,7 @@ def parse_and(args: t.Sequence[lexer.Lexeme]):
 
 @cut_beginning
 def parse_br_or_label(lexemes: t.Sequence[lexer.Lexeme]):
-    if len(lexemes) > 0 and isinstance(lexemes[0], lexer.Word) and lexemes[0].value[:2].lower() == "br":
+    if len(lexemes) > 0 and isinstance(lexemes[0], lexer.Word) and lexemes[0].key[:2] == "br":
         instruction = lexemes[0].value
         flag_char = 2
         n, z, p = False, False, False
@@ -128,7 +141,7 @@ def parse_br_or_label(lexemes: t.Sequence[lexer.Lexeme]):
             label = instructions.Label.new(args[0].value)
             if iserr(label):
                 return label, 2
-            if len(lexemes) > 2 and not isinstance(lexemes[3], lexer.Newline):
+            if len(lexemes) > 2 and not isinstance(lexemes[2], lexer.Newline):
                 return Err("expected newline after statement"), 2
             return instructions.LabelBr(n,z,p, label), 2
     return None
@@ -157,14 +170,58 @@ def skip_function(seq: t.Sequence[lexer.Lexeme], pos: int) -> int:
         pos += 1
     return pos
 
-def parse_lc3(source: str):
+def resynchronize(seq: t.Sequence[lexer.Lexeme], pos: int) -> int:
+    """Skips the rest of a bad statement, up to the next newline"""
+    while len(seq) > pos and not isinstance(seq[pos], lexer.Newline):
+        pos += 1
+    return pos
+
+def parse_lc3(source: str) -> t.Sequence[lexing.Match[ParseTokens]] | ErrList:
+    """Parses ``source``, collecting the diagnostics for every bad statement.
+
+    The spans of the statements are in lexemes; the spans of the diagnostics are in characters.
+    """
     lexeme_matches = lexer.lex_lc3(source)
     if iserr(lexeme_matches):
-        return lexeme_matches
-    
+        return lexeme_matches.errors
+    return parse_lexemes(lexeme_matches)
+
+def parse_lc3_bytes(source: Buffer) -> t.Sequence[lexing.Match[ParseTokens]] | ErrList:
+    """Parses UTF-8 source from any buffer, such as an ``mmap``, as :func:`parse_lc3` does.
+
+    The spans of the diagnostics are in bytes.
+    """
+    lexeme_matches = lexer.lex_lc3_bytes(source)
+    if iserr(lexeme_matches):
+        return lexeme_matches.errors
+    return parse_lexemes(lexeme_matches)
+
+def parse_lexemes(
+        lexeme_matches: t.Sequence[lexing.Match[lexer.Lexeme]],
+        *,
+        stats: t.Optional[PhaseStats] = None) -> t.Sequence[lexing.Match[ParseTokens]] | ErrList:
+    """Parses the output of :func:`lexer.lex_lc3` as :func:`parse_lc3` does.
+
+    :param stats: If given, counts the statements and the calls to each parse function.
+    """
     lexemes = list(map(lambda l: l.lexeme, lexeme_matches))
-    matches = lexing.lex(lexemes, parsing_functions, skip_function)
+    functions = parsing_functions
+    if stats is not None:
+        from .stats import counted
+        functions = counted(parsing_functions, stats)
+    matches = lexing.lex(lexemes, functions, skip_function, resynchronize)
+    if stats is not None:
+        stats.items += len(matches.matches if iserr(matches) else matches)
     if iserr(matches):
-        return matches
+        errors = ErrList(matches.error)
+        for error in matches.matches:
+            if isinstance(error, lexing.ErrMatch):
+                errors.append(lexing.ErrMatch(error.error, source_span(lexeme_matches, error.span)))
+        return errors
     return matches
+
+def source_span(lexeme_matches: t.Sequence[lexing.Match[lexer.Lexeme]], span: lexing.Span) -> lexing.Span:
+    """Converts a span of lexemes to the span of characters they were lexed from"""
+    last = max(span.start, min(span.end, len(lexeme_matches)) - 1)
+    return lexing.Span(lexeme_matches[span.start].span.start, lexeme_matches[last].span.end)
     
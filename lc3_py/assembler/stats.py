@@ -0,0 +1,75 @@
+"""Opt-in per-phase statistics for assembling.
+
+Pass a :class:`StatsCollector` as ``stats`` to :func:`assemble_lc3` and each phase
+records its wall time, how many items it produced, how many match functions it called,
+how many of those calls failed and were backtracked over, and its peak traced memory.
+Without a collector, no phase is timed, traced or wrapped.
+"""
+import contextlib
+from dataclasses import asdict, dataclass
+import json
+import time
+import tracemalloc
+import typing as t
+
+
+@dataclass
+class PhaseStats:
+    seconds: float = 0.0
+    items: int = 0
+    """Lexemes, statements, symbols or words, depending on the phase"""
+    calls: int = 0
+    """Calls to the phase's match functions"""
+    backtracks: int = 0
+    """Match function calls that did not match, so the next alternative was tried"""
+    peak_bytes: int = 0
+
+
+class StatsCollector:
+    def __init__(self, *, trace_allocations: bool = True):
+        """
+        :param trace_allocations: If true, each phase measures its peak allocations with
+            :mod:`tracemalloc`, which slows it down considerably.
+        """
+        self.trace_allocations = trace_allocations
+        self.phases: dict[str, PhaseStats] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> t.Iterator[PhaseStats]:
+        stats = self.phases.setdefault(name, PhaseStats())
+        started_tracing = self.trace_allocations and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif self.trace_allocations:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds += time.perf_counter() - start
+            if self.trace_allocations:
+                stats.peak_bytes = max(stats.peak_bytes, tracemalloc.get_traced_memory()[1])
+            if started_tracing:
+                tracemalloc.stop()
+
+    def as_dict(self) -> dict[str, dict[str, int | float]]:
+        return {name: asdict(stats) for name, stats in self.phases.items()}
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict())
+
+
+_F = t.TypeVar("_F", bound=t.Callable[..., t.Any])
+
+
+def counted(functions: t.Sequence[_F], stats: PhaseStats) -> list[_F]:
+    """Wraps match functions to count their calls and the calls that did not match"""
+    def count(function: _F) -> _F:
+        def wrapped(*args: t.Any) -> t.Any:
+            stats.calls += 1
+            result = function(*args)
+            if result is None:
+                stats.backtracks += 1
+            return result
+        return t.cast(_F, wrapped)
+    return [count(function) for function in functions]
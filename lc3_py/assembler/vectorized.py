@@ -0,0 +1,134 @@
+"""Column-oriented instruction encoding with NumPy, for generating large programs.
+
+Each ``encode_*`` function takes one array (or scalar) per operand, broadcasts them
+together and returns the encoded words as a ``uint16`` array; ``array.array("H",
+words.tobytes())`` turns them into words for an :class:`Image`. Operands are range
+checked as a whole column, raising :class:`ValueError` for the first value that does
+not fit the same ranges as the :mod:`n_bit_number` types. This module requires NumPy.
+"""
+import typing as t
+
+import numpy as np
+import numpy.typing as npt
+
+Column: t.TypeAlias = npt.ArrayLike
+
+
+def _field(values: npt.NDArray[np.int64], bits: int, name: str, *, signed: bool) -> npt.NDArray[np.uint16]:
+    low, high = (-(1 << (bits - 1)), 1 << (bits - 1)) if signed else (0, 1 << bits)
+    bad = (values < low) | (values >= high)
+    if bad.any():
+        index = int(np.argmax(bad))
+        kind = "a signed integer" if signed else "an unsigned integer"
+        raise ValueError(f"{name} {int(values.flat[index])} at index {index} can not be fit into {bits} bits as {kind}")
+    return (values & ((1 << bits) - 1)).astype(np.uint16)
+
+
+def _columns(*columns: Column) -> list[npt.NDArray[np.int64]]:
+    return [np.asarray(column, dtype=np.int64) for column in np.broadcast_arrays(*columns)]
+
+
+def _register(values: npt.NDArray[np.int64], name: str) -> npt.NDArray[np.uint16]:
+    return _field(values, 3, name, signed=False)
+
+
+def _register_operands(opcode: int, destination: Column, operand_1: Column, operand_2: Column) -> npt.NDArray[np.uint16]:
+    destination, operand_1, operand_2 = _columns(destination, operand_1, operand_2)
+    return (opcode << 12
+            | _register(destination, "destination") << 9
+            | _register(operand_1, "operand 1") << 6
+            | _register(operand_2, "operand 2")).astype(np.uint16, copy=False)
+
+
+def _immediate_operands(opcode: int, destination: Column, operand_1: Column, immediate: Column) -> npt.NDArray[np.uint16]:
+    destination, operand_1, immediate = _columns(destination, operand_1, immediate)
+    return (opcode << 12
+            | _register(destination, "destination") << 9
+            | _register(operand_1, "operand 1") << 6
+            | 0x20
+            | _field(immediate, 5, "immediate", signed=True)).astype(np.uint16, copy=False)
+
+
+def _pc_relative(opcode: int, register: Column, pc_offset: Column, name: str) -> npt.NDArray[np.uint16]:
+    register, pc_offset = _columns(register, pc_offset)
+    return (opcode << 12
+            | _register(register, name) << 9
+            | _field(pc_offset, 9, "pc offset", signed=True)).astype(np.uint16, copy=False)
+
+
+def _base_offset(opcode: int, register: Column, base_register: Column, offset: Column, name: str) -> npt.NDArray[np.uint16]:
+    register, base_register, offset = _columns(register, base_register, offset)
+    return (opcode << 12
+            | _register(register, name) << 9
+            | _register(base_register, "base register") << 6
+            | _field(offset, 6, "offset", signed=True)).astype(np.uint16, copy=False)
+
+
+def encode_add(destination: Column, operand_1: Column, operand_2: Column) -> npt.NDArray[np.uint16]:
+    return _register_operands(0x1, destination, operand_1, operand_2)
+
+def encode_add_immediate(destination: Column, operand_1: Column, immediate: Column) -> npt.NDArray[np.uint16]:
+    return _immediate_operands(0x1, destination, operand_1, immediate)
+
+def encode_and(destination: Column, operand_1: Column, operand_2: Column) -> npt.NDArray[np.uint16]:
+    return _register_operands(0x5, destination, operand_1, operand_2)
+
+def encode_and_immediate(destination: Column, operand_1: Column, immediate: Column) -> npt.NDArray[np.uint16]:
+    return _immediate_operands(0x5, destination, operand_1, immediate)
+
+def encode_br(n: Column, z: Column, p: Column, pc_offset: Column) -> npt.NDArray[np.uint16]:
+    n, z, p, pc_offset = _columns(n, z, p, pc_offset)
+    return ((n != 0).astype(np.uint16) << 11
+            | (z != 0).astype(np.uint16) << 10
+            | (p != 0).astype(np.uint16) << 9
+            | _field(pc_offset, 9, "pc offset", signed=True)).astype(np.uint16, copy=False)
+
+def encode_jmp(base_register: Column) -> npt.NDArray[np.uint16]:
+    (base_register,) = _columns(base_register)
+    return (0xC000 | _register(base_register, "base register") << 6).astype(np.uint16, copy=False)
+
+def encode_jsr(pc_offset: Column) -> npt.NDArray[np.uint16]:
+    (pc_offset,) = _columns(pc_offset)
+    return (0x4800 | _field(pc_offset, 11, "pc offset", signed=True)).astype(np.uint16, copy=False)
+
+def encode_jsrr(base_register: Column) -> npt.NDArray[np.uint16]:
+    (base_register,) = _columns(base_register)
+    return (0x4000 | _register(base_register, "base register") << 6).astype(np.uint16, copy=False)
+
+def encode_ld(destination: Column, pc_offset: Column) -> npt.NDArray[np.uint16]:
+    return _pc_relative(0x2, destination, pc_offset, "destination")
+
+def encode_ldi(destination: Column, pc_offset: Column) -> npt.NDArray[np.uint16]:
+    return _pc_relative(0xA, destination, pc_offset, "destination")
+
+def encode_ldr(destination: Column, base_register: Column, offset: Column) -> npt.NDArray[np.uint16]:
+    return _base_offset(0x6, destination, base_register, offset, "destination")
+
+def encode_lea(destination: Column, pc_offset: Column) -> npt.NDArray[np.uint16]:
+    return _pc_relative(0xE, destination, pc_offset, "destination")
+
+def encode_not(destination: Column, source: Column) -> npt.NDArray[np.uint16]:
+    destination, source = _columns(destination, source)
+    return (0x903F | _register(destination, "destination") << 9 | _register(source, "source") << 6).astype(np.uint16, copy=False)
+
+def encode_st(source: Column, pc_offset: Column) -> npt.NDArray[np.uint16]:
+    return _pc_relative(0x3, source, pc_offset, "source")
+
+def encode_sti(source: Column, pc_offset: Column) -> npt.NDArray[np.uint16]:
+    return _pc_relative(0xB, source, pc_offset, "source")
+
+def encode_str(source: Column, base_register: Column, offset: Column) -> npt.NDArray[np.uint16]:
+    return _base_offset(0x7, source, base_register, offset, "source")
+
+def encode_trap(vector: Column) -> npt.NDArray[np.uint16]:
+    (vector,) = _columns(vector)
+    return (0xF000 | _field(vector, 8, "trap vector", signed=False)).astype(np.uint16, copy=False)
+
+def encode_fill(values: Column) -> npt.NDArray[np.uint16]:
+    """Encodes ``.FILL`` words, which may be given signed or unsigned"""
+    (values,) = _columns(values)
+    bad = (values < -0x8000) | (values > 0xFFFF)
+    if bad.any():
+        index = int(np.argmax(bad))
+        raise ValueError(f"value {int(values.flat[index])} at index {index} can not be fit into 16 bits")
+    return (values & 0xFFFF).astype(np.uint16)
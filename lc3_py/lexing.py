@@ -2,7 +2,7 @@ from dataclasses import dataclass
 import re
 import typing as t
 
-from lc3_py.type_additions import Err, has_no_err, iserr
+from lc3_py.type_additions import Err, ErrList, has_no_err, iserr
 
 
 _T = t.TypeVar("_T")
@@ -69,8 +69,12 @@ class AdvancingStr(AdvancingSequence[str]):
             return self._view[self._pos:]
 
 
+UNEXPECTED_INPUT = "unexpected input"
+"""The error :func:`lex` reports where no match function matches"""
+
 MatchFunction: t.TypeAlias = t.Callable[[InputSequence[_T], int], t.Optional[Match[_Lexeme] | ErrMatch]]
 SkipFunction: t.TypeAlias = t.Callable[[InputSequence[_T], int], int]
+RecoverFunction: t.TypeAlias = t.Callable[[InputSequence[_T], int], int]
 
 
 def match_first(
@@ -80,7 +84,7 @@ def match_first(
         ) -> t.Optional[Match[_Lexeme] | ErrMatch]:
     if position >= len(input_sequence):
         return None
-    return next(filter(None, [match_function(input_sequence, position) for match_function in match_functions]))
+    return next(filter(None, (match_function(input_sequence, position) for match_function in match_functions)), None)
 
 
 # PatternRegexMapping: t.TypeAlias = t.Mapping[re.Pattern[str], t.Callable[[tuple[str, ...]], _Lexeme | Err]]
@@ -114,11 +118,50 @@ def get_match_functions_from_regex(mapping: StringRegexMapping[_Lexeme]) -> t.Se
     return match_functions
 
 
+def get_match_functions_from_bytes_regex(mapping: StringRegexMapping[_Lexeme]) -> t.Sequence[MatchFunction[int, _Lexeme]]:
+    """Gets match functions for lexing UTF-8 from a bytes-like object, such as a :class:`memoryview` of an ``mmap``.
+
+    The patterns are compiled as bytes patterns, so classes like ``\\s`` and ``\\d`` only match
+    ASCII, and spans are in bytes. The buffer is matched in place; only the matched groups
+    are copied and decoded.
+    """
+    match_functions: list[MatchFunction[int, _Lexeme]] = []
+    for pattern, constructor in mapping.items():
+        compiled = re.compile(("(" + pattern + ")").encode())
+        def match_function(
+                input_sequence: t.Sequence[int],
+                position: int,
+                pattern: re.Pattern[bytes] = compiled,
+                constructor: t.Callable[[tuple[str, ...]], _Lexeme | Err] = constructor) -> t.Optional[Match[_Lexeme] | ErrMatch]:
+
+            match = pattern.match(t.cast(t.Any, input_sequence), position)
+            if match:
+                span = Span(start=match.start(), end=match.end())
+                try:
+                    groups = tuple(group.decode() for group in match.groups())
+                except UnicodeDecodeError:
+                    return ErrMatch("invalid UTF-8", span)
+                lexeme = constructor(groups)
+                if iserr(lexeme):
+                    return ErrMatch(lexeme.error, span)
+                return Match(lexeme=lexeme, span=span)
+            return None
+
+        match_functions.append(match_function)
+    return match_functions
+
+
 
 def lex(
         input_sequence: InputSequence[_T],
         match_functions: t.Sequence[MatchFunction[_T, _Lexeme]],
-        skip_function: t.Optional[SkipFunction[_T]] = None) -> t.Sequence[Match[_Lexeme]] | InvalidSequence[_Lexeme]:
+        skip_function: t.Optional[SkipFunction[_T]] = None,
+        recover_function: t.Optional[RecoverFunction[_T]] = None) -> t.Sequence[Match[_Lexeme]] | InvalidSequence[_Lexeme]:
+    """
+    :param recover_function: If given, lexing resumes after an error from the position this
+        returns when called with the end of the error, so that every error is collected.
+        Otherwise lexing stops where nothing matches.
+    """
 
     pos = 0
     matches: list[Match[_Lexeme] | ErrMatch] = []
@@ -127,8 +170,16 @@ def lex(
             pos = skip_function(input_sequence, pos)
         match = match_first(input_sequence, pos, match_functions)
         if not match:
-            break
+            if pos >= len(input_sequence):
+                break
+            match = ErrMatch(UNEXPECTED_INPUT, Span(pos, pos + 1))
+            if recover_function is None:
+                matches.append(match)
+                break
         matches.append(match)
+        if recover_function is not None and isinstance(match, ErrMatch):
+            pos = recover_function(input_sequence, max(match.span.end, pos + 1))
+            continue
         pos = match.span.end
         
     if has_no_err(matches):
@@ -143,4 +194,11 @@ class InvalidSequence(Err, t.Generic[_Lexeme]):
 
     @property
     def matches(self) -> list[Match[_Lexeme] | ErrMatch]:
-        return self._matches
\ No newline at end of file
+        return self._matches
+
+    @property
+    def errors(self) -> ErrList:
+        """The errors among :attr:`matches`, in order"""
+        errors = ErrList(self.error)
+        errors.extend(match for match in self._matches if isinstance(match, ErrMatch))
+        return errors
\ No newline at end of file
@@ -1,8 +1,11 @@
 import abc
 import bisect
-from dataclasses import dataclass
+import contextlib
+from dataclasses import dataclass, field
+import importlib
 import itertools
 import re
+import time
 import typing as t
 
 from lc3_py.type_additions import Err, iserr
@@ -98,6 +101,150 @@ class ErrToken(Err):
     def __repr__(self):
         return str(self)
 
+class Expected(ErrToken):
+    """A failure to match ``expectation``, whose message is only formatted when read"""
+    expectation: str
+
+    def __init__(self, expectation: str, start: int):
+        object.__setattr__(self, "expectation", expectation)
+        object.__setattr__(self, "start", start)
+
+    @property
+    def error(self) -> str:
+        return f"expected {self.expectation}"
+
+
+class Relocated(ErrToken):
+    """Reports ``cause`` at another position without formatting its message"""
+    cause: Err
+
+    def __init__(self, cause: Err, start: int):
+        object.__setattr__(self, "cause", cause)
+        object.__setattr__(self, "start", start)
+
+    @property
+    def error(self) -> str:
+        return self.cause.error
+
+
+class _FailureTracker:
+    def __init__(self):
+        self.furthest = -1
+        self.expectations: list[str] = []
+
+    def record(self, expectation: str, start: int):
+        if start > self.furthest:
+            self.furthest = start
+            self.expectations = [expectation]
+        elif start == self.furthest:
+            self.expectations.append(expectation)
+
+    def error(self, failure: ErrToken) -> ErrToken:
+        """Gets everything expected at the furthest position, or ``failure`` if it got further"""
+        if not self.expectations or failure.start > self.furthest:
+            return failure
+        unique = list(dict.fromkeys(self.expectations))
+        return Expected(unique[0] if len(unique) == 1 else "one of " + ", ".join(unique), self.furthest)
+
+
+_tracker: t.Optional[_FailureTracker] = None
+
+
+def expected(expectation: str, start: int) -> Expected:
+    """Fails to match ``expectation`` at ``start``, noting it if the furthest failure is tracked"""
+    if _tracker is not None:
+        _tracker.record(expectation, start)
+    return Expected(expectation, start)
+
+
+@dataclass
+class CombinatorProfile:
+    name: str
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    cumulative_seconds: float = 0.0
+    """Time spent in the combinator, including the combinators it called; recursive calls are counted once"""
+    self_seconds: float = 0.0
+    """Time spent in the combinator, excluding the combinators it called"""
+
+
+class CombinatorProfiler:
+    """Times every combinator call while :func:`profiling` is active"""
+    def __init__(self):
+        self.profiles: dict[str, CombinatorProfile] = {}
+        self.stacks: dict[tuple[str, ...], float] = {}
+        """The self time spent under each stack of combinator names, outermost first"""
+        self._stack: list[str] = []
+        self._child_seconds: list[float] = []
+        self._active: dict[str, int] = {}
+
+    def call(self, combinator: Combinator[_In, _Out], seq: AdvancingSequence[_In]) -> CombinatorResult[_In, _Out]:
+        name = combinator.name
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = CombinatorProfile(name)
+        self._stack.append(name)
+        self._child_seconds.append(0.0)
+        self._active[name] = self._active.get(name, 0) + 1
+        start = time.perf_counter()
+        try:
+            result = combinator.function(seq)
+        finally:
+            elapsed = time.perf_counter() - start
+            self_seconds = elapsed - self._child_seconds.pop()
+            stack = tuple(self._stack)
+            self._stack.pop()
+            self._active[name] -= 1
+            if self._child_seconds:
+                self._child_seconds[-1] += elapsed
+            profile.calls += 1
+            profile.self_seconds += self_seconds
+            if not self._active[name]:
+                profile.cumulative_seconds += elapsed
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + self_seconds
+        if iserr(result):
+            profile.failures += 1
+        else:
+            profile.successes += 1
+        return result
+
+    def report(self, sort: str = "self_seconds", limit: t.Optional[int] = None) -> list[CombinatorProfile]:
+        """Gets the profiled combinators, sorted by the :class:`CombinatorProfile` field ``sort``, largest first"""
+        return sorted(self.profiles.values(), key=lambda profile: getattr(profile, sort), reverse=True)[:limit]
+
+    def write_collapsed(self, file: t.TextIO):
+        """Writes the stacks in the collapsed format read by flamegraph tools, in microseconds.
+
+        Frames are separated by ``;``, so any ``;`` in a combinator's name is written as ``:``.
+        """
+        for stack, seconds in self.stacks.items():
+            frames = ";".join(name.replace(";", ":").replace("\n", " ") for name in stack)
+            file.write(f"{frames} {round(seconds * 1_000_000)}\n")
+
+
+def format_profile(profiles: t.Iterable[CombinatorProfile]) -> str:
+    rows = [f"{'calls':>10} {'successes':>10} {'failures':>10} {'cumulative':>12} {'self':>12}  name"]
+    for profile in profiles:
+        rows.append(f"{profile.calls:>10} {profile.successes:>10} {profile.failures:>10} "
+                    f"{profile.cumulative_seconds:>12.6f} {profile.self_seconds:>12.6f}  {profile.name}")
+    return "\n".join(rows)
+
+
+_profiler: t.Optional[CombinatorProfiler] = None
+
+
+@contextlib.contextmanager
+def profiling() -> t.Iterator[CombinatorProfiler]:
+    """Profiles every combinator called inside the block"""
+    global _profiler
+    outer, _profiler = _profiler, CombinatorProfiler()
+    try:
+        yield _profiler
+    finally:
+        _profiler = outer
+
+
 @dataclass(frozen=True)
 class Span():
     start: int
@@ -115,14 +262,11 @@ CombinatorResult: t.TypeAlias =  tuple[AdvancingSequence[_In], _Out] | ErrToken
 CombinatorFunction: t.TypeAlias = t.Callable[[AdvancingSequence[_In]], CombinatorResult[_In, _Out]]
 
 
+_LINE_BREAK = re.compile(r"\r\n?|\n")
+
 class IndexToPositionConverter:
     def __init__(self, text: str):
-        self._line_starts = [0]
-        for i, char in enumerate(text):
-            if char == "\n":
-                self._line_starts.append(i + 1)
-            elif char == "\r" and not (i + 1 < len(text) and text[i + 1] == "\n"):
-                self._line_starts.append(i + 1)
+        self._line_starts = [0, *(match.end() for match in _LINE_BREAK.finditer(text))]
     def get(self, index: int) -> Position:
         if index < 0:
             raise ValueError("Index cannot be negative.")
@@ -136,9 +280,27 @@ class IndexToPositionConverter:
 
 @dataclass(frozen=True)
 class Combinator(abc.ABC, t.Generic[_In, _Out]):
+    """
+    Combinators pickle as their recipe, the builder and arguments that made them, so a
+    grammar can be sent to worker processes if the functions passed to :meth:`map` and
+    :func:`combinator` are defined at module level.
+    """
     function: CombinatorFunction[_In, _Out]
     name: str
-    
+    recipe: t.Optional[tuple[t.Callable[..., Combinator[t.Any, t.Any]], tuple[t.Any, ...]]] = field(
+        default=None, compare=False, repr=False)
+
+    def __reduce__(self) -> str | tuple[t.Any, ...]:
+        if self.recipe is None:
+            raise TypeError(f"cannot pickle {self.name}: it was built from a function that is not defined at module level")
+        builder, args = self.recipe
+        if builder is _function_combinator:
+            # A decorated function's module attribute is the combinator itself, so it pickles by reference.
+            module, qualname = args[0].__module__, args[0].__qualname__
+            with contextlib.suppress(ImportError, AttributeError):
+                if _global(module, qualname) is self:
+                    return _global, (module, qualname)
+        return self.recipe
 
     def as_token(self) -> Combinator[_In, Token[_Out]]:
         @combinator(f"with_token({self.name})")
@@ -146,9 +308,9 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
             start = seq.pos
             res = self(seq)
             if iserr(res):
-                return ErrToken(res.error, start=start)
+                return Relocated(res, start=start)
             return res[0], Token(res[1], span=Span(start=start, end=res[0].pos))
-        return comb
+        return _recipe(comb, Combinator.as_token, self)
     
 
     def map[T](self, function: t.Callable[[_Out], T]) -> Combinator[_In, T]:
@@ -157,13 +319,13 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
             start = seq.pos
             res = self(seq)
             if iserr(res):
-                return ErrToken(res.error, start=start)
+                return Relocated(res, start=start)
             try:
                 obj = function(res[1])
             except RuntimeError as e:
                 return ErrToken(str(e), res[0].pos)
             return res[0], obj
-        return comb
+        return _recipe(comb, Combinator.map, self, function)
             
 
     def postskip(self, skipper: Combinator[_In, t.Any]) -> Combinator[_In, _Out]:
@@ -178,7 +340,7 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
                 seq = res[0]
 
             return seq, obj
-        return comb
+        return _recipe(comb, Combinator.postskip, self, skipper)
     
     def preskip(self, skipper: Combinator[_In, t.Any]) -> Combinator[_In, _Out]:
         @combinator(f"({skipper.name})?{self.name}")
@@ -187,7 +349,7 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
                 seq = res[0]
             res = self(seq)
             return res
-        return comb
+        return _recipe(comb, Combinator.preskip, self, skipper)
     
     def consume(self, consumer: Combinator[_In, t.Any]) -> Combinator[_In, _Out]:
         @combinator(f"{self.name}(?={consumer.name})")
@@ -201,27 +363,36 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
             
             res3 = res2[0], res1[1]
             return res3
-        return comb
+        return _recipe(comb, Combinator.consume, self, consumer)
 
-    def parse_many(self, seq: t.Sequence[_In]) -> t.Sequence[_Out] | Err:
+    def parse_many(self, seq: t.Sequence[_In], *, furthest_failure: bool = False) -> t.Sequence[_Out] | Err:
+        """
+        :param furthest_failure: If true, a failed parse reports everything expected at the
+            furthest position any alternative reached, rather than the last error returned.
+        """
         out: list[_Out] = []
 
         inp_advancer = sequence_to_advancer(seq)
-    
-        while not iserr(v := self(inp_advancer)):
-            out.append(v[1])
-            inp_advancer = v[0]
+        with _tracking(furthest_failure) as tracker:
+            while not iserr(v := self(inp_advancer)):
+                out.append(v[1])
+                inp_advancer = v[0]
         if len(inp_advancer) > 0:
-            return v
+            return v if tracker is None else tracker.error(v)
         return out
     
-    def parse(self, seq: t.Sequence[_In]) -> _Out  | ErrToken:
+    def parse(self, seq: t.Sequence[_In], *, furthest_failure: bool = False) -> _Out  | ErrToken:
+        """
+        :param furthest_failure: If true, a failed parse reports everything expected at the
+            furthest position any alternative reached, rather than the last error returned.
+        """
         inp_advancer = sequence_to_advancer(seq)
-        if iserr(v := self(inp_advancer)):
-            return v
-        
-        if len(v[0]) > 0:
-            return ErrToken("expected end of file", start=v[0].pos)
+        with _tracking(furthest_failure) as tracker:
+            v = self(inp_advancer)
+            if not iserr(v) and len(v[0]) > 0:
+                v = expected("end of file", v[0].pos)
+        if iserr(v):
+            return v if tracker is None else tracker.error(v)
         return v[1]
     
 
@@ -232,7 +403,7 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
             if iserr(res):
                 return other(seq)
             return res
-        return comb
+        return _recipe(comb, Combinator.otherwise, self, other)
     
     def then(self: Combinator[_In, _Addative], other: Combinator[_In, _Addative]):
         @combinator(f"({self.name} + {other.name})")
@@ -247,7 +418,7 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
                 return res2
             join_obj = res1[1] + res2[1]
             return res2[0], join_obj
-        return comb
+        return _recipe(comb, Combinator.then, self, other)
     
     def many(self) -> Combinator[_In, list[_Out]]:
         @combinator(f"({self.name})*")
@@ -257,7 +428,7 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
                 outputs.append(res[1])
                 seq = res[0]
             return seq, outputs
-        return comb
+        return _recipe(comb, Combinator.many, self)
     
     def cons[_Out2](self, other: Combinator[_In, _Out2]) -> Combinator[_In, tuple[_Out, _Out2]]:
         @combinator(f"({self.name} + {other.name})")
@@ -272,7 +443,7 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
                 return res2
             
             return res2[0], (res1[1], res2[1])
-        return comb
+        return _recipe(comb, Combinator.cons, self, other)
     
     @t.overload
     def append[_Out1, _Out11, _Out2](self: Combinator[_In, tuple[_Out1, _Out11]], other: Combinator[_In, _Out2]) -> Combinator[_In, tuple[_Out1, _Out11, _Out2]]: ...
@@ -291,11 +462,13 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
                 return res2
             
             return res2[0], (*res1[1], res2[1])
-        return comb
+        return _recipe(comb, Combinator.append, self, other)
 
 
 
     def __call__(self, seq: AdvancingSequence[_In]) -> CombinatorResult[_In, _Out]:
+        if _profiler is not None:
+            return _profiler.call(self, seq)
         return self.function(seq)
     def __or__(self, other: Combinator[_In, _Out2]):
         return self.otherwise(other)
@@ -303,17 +476,64 @@ class Combinator(abc.ABC, t.Generic[_In, _Out]):
         return self.then(other)
     
 class ForwardCombinator(Combinator[_In, _Out]):
+    definition: t.Optional[Combinator[_In, _Out]]
+
     def __init__(self, name: str):
         def error(seq: AdvancingSequence[_In]) -> CombinatorResult[_In, _Out]:
             return ErrToken("undefined forward combinator", seq.pos)
         super().__init__(function=error, name=name)
+        object.__setattr__(self, "definition", None)
     def define(self, combinator: Combinator[_In, _Out]):
         object.__setattr__(self, "function", combinator.function)
+        object.__setattr__(self, "definition", combinator)
+
+    def __reduce__(self) -> str | tuple[t.Any, ...]:
+        # The definition is restored after the forward combinator exists, so that
+        # recursive grammars unpickle.
+        return ForwardCombinator, (self.name,), self.definition
+    def __setstate__(self, definition: Combinator[_In, _Out]):
+        self.define(definition)
 
 def forward[In, Out](type_in: t.Type[In], type_out: t.Type[Out], name: str = "ForwardCombinator") -> ForwardCombinator[In, Out]:
     return ForwardCombinator[In, Out](name)
 
 
+@contextlib.contextmanager
+def _tracking(enabled: bool) -> t.Iterator[t.Optional[_FailureTracker]]:
+    global _tracker
+    if not enabled:
+        yield None
+        return
+    outer, _tracker = _tracker, _FailureTracker()
+    try:
+        yield _tracker
+    finally:
+        _tracker = outer
+
+
+def _recipe[C: Combinator[t.Any, t.Any]](comb: C, builder: t.Callable[..., t.Any], *args: t.Any) -> C:
+    object.__setattr__(comb, "recipe", (builder, args))
+    return comb
+
+
+def _global(module: str, qualname: str) -> t.Any:
+    obj = importlib.import_module(module)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _function_combinator(function: CombinatorFunction[t.Any, t.Any], name: str) -> Combinator[t.Any, t.Any]:
+    return Combinator(function=function, name=name)
+
+
+def _by_reference[C: Combinator[t.Any, t.Any]](comb: C, function: t.Callable[..., t.Any]) -> C:
+    """Pickles ``comb`` as the module attribute it is bound to when used as a decorator, or else as its function and name"""
+    if "<locals>" in function.__qualname__:
+        return comb
+    return _recipe(comb, _function_combinator, function, comb.name)
+
+
 def sequence_to_advancer[T](seq: t.Sequence[T]) -> AdvancingSequence[T]:
     if isinstance(seq, str):
         return StrAdvancer(seq) # type: ignore
@@ -337,9 +557,9 @@ def combinator(function: CombinatorFunction[_In, _Out], /) -> Combinator[_In, _O
 def combinator(name_or_function: CombinatorFunction[_In, _Out] | str, /) -> Combinator[_In, _Out] | t.Callable[[CombinatorFunction[_In, _Out]], Combinator[_In, _Out]]:
     if isinstance(name_or_function, str):
         def wrapped(function: CombinatorFunction[_In, _Out]):
-            return Combinator[_In, _Out](function=function, name=name_or_function)
+            return _by_reference(Combinator[_In, _Out](function=function, name=name_or_function), function)
         return wrapped
-    return Combinator(function=name_or_function, name=name_or_function.__name__)
+    return _by_reference(Combinator(function=name_or_function, name=name_or_function.__name__), name_or_function)
 
 
 def start_match(t1: AdvancingSequence[t.Any], t2: t.Sequence[t.Any], ) -> bool:
@@ -348,27 +568,34 @@ def start_match(t1: AdvancingSequence[t.Any], t2: t.Sequence[t.Any], ) -> bool:
 def string(string: str):
     if len(string) == 0:
         raise ValueError("string must be nonempty")
-    @combinator(f"'{string}'")
+    name = f"'{string}'"
+    @combinator(name)
     def c(seq: AdvancingSequence[str]):
         if start_match(seq, string):
             return seq.advance(len(string)), string
-        return ErrToken(f"expected '{string}'", seq.pos)
-    return c
+        return expected(name, seq.pos)
+    return _recipe(c, _string, string)
+
+_string = string
 
 
 def regex_groups(pattern: str):
     if len(pattern) == 0:
         raise ValueError("pattern must be nonempty")
-    compiled_pattern = re.compile(f"{pattern}".encode())
-    @combinator(f"r'{pattern}'")
+    compiled_pattern: t.Optional[re.Pattern[bytes]] = None
+    name = f"r'{pattern}'"
+    @combinator(name)
     def c(seq: AdvancingSequence[str]):
+        nonlocal compiled_pattern
+        if compiled_pattern is None:
+            compiled_pattern = re.compile(pattern.encode())
         seq = optimize_str_advancer(seq)
-        match = next(re.finditer(compiled_pattern, seq), ErrToken(f"expected r'{pattern}'", seq.pos))
-        if iserr(match):
-            return match
+        match = next(re.finditer(compiled_pattern, seq), None)
+        if match is None:
+            return expected(name, seq.pos)
         return seq.byte_advance(match.end()), tuple(map(bytes.decode, filter(lambda x: x is not None, match.groups()))) or (bytes.decode(match.group(0)),)
-    return c
+    return _recipe(c, regex_groups, pattern)
 
 def regex(pattern: str):
-    return regex_groups(pattern).map(lambda x: x[0])
+    return _recipe(regex_groups(pattern).map(lambda x: x[0]), regex, pattern)
 
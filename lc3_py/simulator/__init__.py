@@ -0,0 +1,55 @@
+"""Simulating the LC-3.
+
+The names below are imported from their modules on first use, so importing the package
+does not build the simulator's tables or import :mod:`multiprocessing` and :mod:`asyncio`.
+"""
+import importlib
+import typing as t
+
+if t.TYPE_CHECKING:
+    from .coverage import Coverage
+    from .fuzzer import fuzz
+    from .profiler import Profiler
+    from .runner import run_batch
+    from .session import run_session
+    from .simulator import ExitReason, RunResult, Simulator, Snapshot
+    from .undo import UndoLog
+
+_LAZY_NAMES = {
+    "Simulator": "simulator",
+    "ExitReason": "simulator",
+    "RunResult": "simulator",
+    "Snapshot": "simulator",
+    "Coverage": "coverage",
+    "Profiler": "profiler",
+    "UndoLog": "undo",
+    "run_batch": "runner",
+    "run_session": "session",
+    "fuzz": "fuzzer",
+}
+
+__all__ = [
+    "Coverage",
+    "ExitReason",
+    "Profiler",
+    "RunResult",
+    "Simulator",
+    "Snapshot",
+    "UndoLog",
+    "fuzz",
+    "run_batch",
+    "run_session",
+]
+assert set(__all__) == set(_LAZY_NAMES)
+
+
+def __getattr__(name: str) -> t.Any:
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(importlib.import_module(f".{module}", __name__), name)
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_NAMES})
@@ -0,0 +1,66 @@
+"""Instruction and branch coverage for simulated programs.
+
+A :class:`Coverage` sets one bit per executed address and one bit per branch outcome.
+:meth:`Simulator.enable_coverage` marks it from a dedicated dispatch loop; while other
+tracers are attached it is marked as one more tracer instead. It stays attached across
+:meth:`Simulator.restore`, so a test suite run against one simulator accumulates into one
+bitmap, and bitmaps from separate simulators or processes combine with :meth:`Coverage.merge`.
+"""
+import typing as t
+
+from .simulator import Simulator, MEMORY_SIZE
+
+
+def _or_into(target: bytearray, source: bytes | bytearray):
+    merged = int.from_bytes(target, "little") | int.from_bytes(source, "little")
+    target[:] = merged.to_bytes(len(target), "little")
+
+
+class Coverage:
+    def __init__(self):
+        self.executed = bytearray(MEMORY_SIZE // 8)
+        """Bit ``address`` is set once the instruction at ``address`` has executed"""
+        self.branches = bytearray(MEMORY_SIZE // 4)
+        """Bit ``2 * address`` is set once the branch at ``address`` was taken, and the next bit once it was not"""
+
+    def trace(self, simulator: Simulator, pc: int, instruction: int):
+        self.executed[pc >> 3] |= 1 << (pc & 0x7)
+        if not instruction >> 12:
+            bit = (pc << 1) | (not (instruction >> 9) & simulator._psr & 0x7)
+            self.branches[bit >> 3] |= 1 << (bit & 0x7)
+
+    def merge(self, other: Coverage):
+        _or_into(self.executed, other.executed)
+        _or_into(self.branches, other.branches)
+
+    def __ior__(self, other: Coverage) -> Coverage:
+        self.merge(other)
+        return self
+
+    def clear(self):
+        self.executed[:] = bytes(len(self.executed))
+        self.branches[:] = bytes(len(self.branches))
+
+    def covered(self, address: int) -> bool:
+        return bool(self.executed[address >> 3] & (1 << (address & 0x7)))
+
+    def branch_outcomes(self, address: int) -> tuple[bool, bool]:
+        """Gets whether the branch at ``address`` has been taken and whether it has fallen through"""
+        outcomes = (self.branches[address >> 2] >> ((address & 0x3) << 1)) & 0x3
+        return bool(outcomes & 0x1), bool(outcomes & 0x2)
+
+    @property
+    def covered_count(self) -> int:
+        return int.from_bytes(self.executed, "little").bit_count()
+
+    @property
+    def branch_outcome_count(self) -> int:
+        return int.from_bytes(self.branches, "little").bit_count()
+
+    def uncovered_lines(self, lines: t.Mapping[int, int]) -> list[int]:
+        """Gets the source lines none of whose instructions have executed.
+
+        :param lines: A mapping from the addresses of the program's instructions to their source lines.
+        """
+        covered = {line for address, line in lines.items() if self.covered(address)}
+        return sorted({line for line in lines.values() if line not in covered})
@@ -0,0 +1,212 @@
+"""Memory-mapped devices living in the device register page at xFE00 and above.
+
+Devices are attached to a :class:`Simulator`, which routes accesses to their registers
+through its page table, so ordinary memory accesses never look at devices. A device
+that needs to act later asks the simulator to :meth:`Simulator.schedule` it for a given
+instruction count, and interrupts are level-triggered: after any scheduled event the
+simulator asks every device for its :meth:`Device.interrupt_request`.
+"""
+import abc
+import typing as t
+
+from lc3_py.system_constants import KBSR, KBDR, DSR, DDR, MCR
+
+from .exit_reason import ExitReason, MachineStop
+
+if t.TYPE_CHECKING:
+    from .simulator import Simulator
+
+READY = 0x8000
+INTERRUPT_ENABLE = 0x4000
+CLOCK_ENABLE = 0x8000
+
+KEYBOARD_VECTOR = 0x80
+KEYBOARD_PRIORITY = 4
+
+TMR = 0xFE08
+TMI = 0xFE0A
+TIMER_VECTOR = 0x81
+TIMER_PRIORITY = 6
+
+
+class Device(abc.ABC):
+    addresses: t.ClassVar[tuple[int, ...]]
+    """The device register addresses this device answers to"""
+
+    @abc.abstractmethod
+    def read(self, simulator: Simulator, address: int) -> int: ...
+
+    @abc.abstractmethod
+    def write(self, simulator: Simulator, address: int, value: int): ...
+
+    @abc.abstractmethod
+    def save(self) -> t.Any:
+        """Captures the device's state for a snapshot"""
+        ...
+
+    @abc.abstractmethod
+    def restore(self, state: t.Any): ...
+
+    def fire(self, simulator: Simulator, token: int):
+        """Called when an event this device scheduled comes due"""
+
+    def interrupt_request(self) -> t.Optional[tuple[int, int]]:
+        """The ``(vector, priority)`` of the interrupt this device is asserting, if any"""
+        return None
+
+
+class Keyboard(Device):
+    addresses = (KBSR, KBDR)
+
+    def __init__(self):
+        self.wait = False
+        """If true, reading KBSR with no pending input stops the machine to wait for input"""
+        self._input = bytearray()
+        self._position = 0
+        self._interrupt_enable = False
+
+    @property
+    def pending(self) -> bool:
+        return self._position < len(self._input)
+
+    def feed(self, simulator: Simulator, data: bytes):
+        self._input += data
+        if self._interrupt_enable and data:
+            simulator.schedule(0, self)
+
+    def getc(self) -> int:
+        """Takes the next character, stopping the machine if there is none"""
+        if self._position >= len(self._input):
+            raise MachineStop(ExitReason.WAITING_FOR_INPUT)
+        self._position += 1
+        return self._input[self._position - 1]
+
+    def read(self, simulator: Simulator, address: int) -> int:
+        status = INTERRUPT_ENABLE if self._interrupt_enable else 0
+        if address == KBSR:
+            if self.pending:
+                return READY | status
+            if self.wait:
+                raise MachineStop(ExitReason.WAITING_FOR_INPUT)
+            return status
+        if self.pending:
+            self._position += 1
+            return self._input[self._position - 1]
+        return 0
+
+    def write(self, simulator: Simulator, address: int, value: int):
+        if address == KBSR:
+            self._interrupt_enable = bool(value & INTERRUPT_ENABLE)
+            if self._interrupt_enable and self.pending:
+                simulator.schedule(0, self)
+
+    def interrupt_request(self) -> t.Optional[tuple[int, int]]:
+        if self._interrupt_enable and self.pending:
+            return KEYBOARD_VECTOR, KEYBOARD_PRIORITY
+        return None
+
+    def save(self) -> tuple[bytes, int, bool]:
+        return bytes(self._input), self._position, self._interrupt_enable
+
+    def restore(self, state: tuple[bytes, int, bool]):
+        self._input[:], self._position, self._interrupt_enable = state
+
+
+class Display(Device):
+    addresses = (DSR, DDR)
+
+    def __init__(self):
+        self.output = bytearray()
+
+    def read(self, simulator: Simulator, address: int) -> int:
+        return READY if address == DSR else 0
+
+    def write(self, simulator: Simulator, address: int, value: int):
+        if address == DDR:
+            self.output.append(value & 0xFF)
+
+    def save(self) -> bytes:
+        return bytes(self.output)
+
+    def restore(self, state: bytes):
+        self.output[:] = state
+
+
+class MachineControl(Device):
+    addresses = (MCR,)
+
+    def __init__(self):
+        self.value = CLOCK_ENABLE
+
+    @property
+    def running(self) -> bool:
+        return bool(self.value & CLOCK_ENABLE)
+
+    def halt(self):
+        self.value &= ~CLOCK_ENABLE
+        raise MachineStop(ExitReason.HALT, completed=True)
+
+    def read(self, simulator: Simulator, address: int) -> int:
+        return self.value
+
+    def write(self, simulator: Simulator, address: int, value: int):
+        self.value = value
+        if not value & CLOCK_ENABLE:
+            raise MachineStop(ExitReason.HALT, completed=True)
+
+    def save(self) -> int:
+        return self.value
+
+    def restore(self, state: int):
+        self.value = state
+
+
+class Timer(Device):
+    """A programmable interval timer.
+
+    Writing a nonzero number of instructions to TMI starts the timer, which then sets the
+    ready bit of TMR every interval; reading TMR acknowledges it. If bit 14 of TMR is set, a
+    ready timer raises an interrupt through :data:`TIMER_VECTOR` at :data:`TIMER_PRIORITY`.
+    """
+    addresses = (TMR, TMI)
+
+    def __init__(self):
+        self._interval = 0
+        self._ready = False
+        self._interrupt_enable = False
+        self._generation = 0
+
+    def read(self, simulator: Simulator, address: int) -> int:
+        if address == TMI:
+            return self._interval
+        status = (READY if self._ready else 0) | (INTERRUPT_ENABLE if self._interrupt_enable else 0)
+        self._ready = False
+        return status
+
+    def write(self, simulator: Simulator, address: int, value: int):
+        if address == TMR:
+            self._interrupt_enable = bool(value & INTERRUPT_ENABLE)
+            if self._interrupt_enable and self._ready:
+                simulator.schedule(0, self)
+            return
+        self._interval = value
+        self._generation += 1
+        if value:
+            simulator.schedule(value, self, self._generation)
+
+    def fire(self, simulator: Simulator, token: int):
+        if token != self._generation or not self._interval:
+            return
+        self._ready = True
+        simulator.schedule(self._interval, self, self._generation)
+
+    def interrupt_request(self) -> t.Optional[tuple[int, int]]:
+        if self._interrupt_enable and self._ready:
+            return TIMER_VECTOR, TIMER_PRIORITY
+        return None
+
+    def save(self) -> tuple[int, bool, bool, int]:
+        return self._interval, self._ready, self._interrupt_enable, self._generation
+
+    def restore(self, state: tuple[int, bool, bool, int]):
+        self._interval, self._ready, self._interrupt_enable, self._generation = state
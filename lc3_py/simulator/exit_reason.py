@@ -0,0 +1,24 @@
+import enum
+
+
+class ExitReason(enum.Enum):
+    HALT = "halt"
+    BUDGET_EXHAUSTED = "budget exhausted"
+    TIMEOUT = "timeout"
+    INVALID_OPCODE = "invalid opcode"
+    UNKNOWN_TRAP = "unknown trap"
+    PRIVILEGE_VIOLATION = "privilege violation"
+    ACCESS_VIOLATION = "access violation"
+    WAITING_FOR_INPUT = "waiting for input"
+
+
+class MachineStop(Exception):
+    """Raised from an instruction, or a device it touches, to end the current batch of instructions.
+
+    If ``completed`` is false, the instruction had no effect and the PC is left pointing at it.
+    A ``reason`` of ``None`` only hands control back to the scheduler and the run continues.
+    """
+    def __init__(self, reason: ExitReason | None, completed: bool = False):
+        super().__init__(reason.value if reason else "yield")
+        self.reason = reason
+        self.completed = completed
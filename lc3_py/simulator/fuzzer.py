@@ -0,0 +1,157 @@
+"""A coverage-guided fuzzer for console input.
+
+Like :func:`run_batch`, the loaded machine is handed to a pool of workers once and each
+worker restores its snapshot before every input. The parent mutates the corpus into
+rounds of inputs; a worker runs each one with :class:`Coverage` enabled and reports the
+inputs that reached coverage bits the worker had not seen, or that faulted. The parent
+keeps the inputs that are new to the merged coverage and mutates them in later rounds.
+"""
+from dataclasses import dataclass, field
+import os
+import random
+import typing as t
+
+from .coverage import Coverage
+from .runner import _get_context
+from .simulator import ExitReason, Simulator, Snapshot
+
+FAULTS = frozenset([
+    ExitReason.INVALID_OPCODE, ExitReason.UNKNOWN_TRAP,
+    ExitReason.PRIVILEGE_VIOLATION, ExitReason.ACCESS_VIOLATION])
+
+_INTERESTING_BYTES = b"\x00\x01\n\r 0123456789-+Aaz\x7f\x80\xff"
+_MAX_INPUT_LENGTH = 4096
+
+
+@dataclass(frozen=True)
+class Crash:
+    data: bytes
+    exit_reason: ExitReason
+    pc: int
+    """The address of the faulting instruction"""
+
+
+@dataclass
+class FuzzResult:
+    corpus: list[bytes]
+    """The inputs that each reached new coverage, in the order they were found"""
+    crashes: list[Crash]
+    """The first input found for each distinct fault and faulting address"""
+    coverage: Coverage = field(default_factory=Coverage)
+    executions: int = 0
+
+
+def mutate(data: bytes, corpus: t.Sequence[bytes], rng: random.Random) -> bytes:
+    """Applies between one and four random edits to ``data``"""
+    mutated = bytearray(data)
+    for _ in range(rng.randint(1, 4)):
+        choice = rng.randrange(6)
+        position = rng.randrange(len(mutated) + 1)
+        if choice == 0 and mutated:
+            mutated[position % len(mutated)] ^= 1 << rng.randrange(8)
+        elif choice == 1 and mutated:
+            mutated[position % len(mutated)] = rng.randrange(256)
+        elif choice == 2:
+            mutated.insert(position, rng.choice(_INTERESTING_BYTES))
+        elif choice == 3 and mutated:
+            del mutated[position % len(mutated):position % len(mutated) + rng.randint(1, 4)]
+        elif choice == 4:
+            other = rng.choice(corpus)
+            start = rng.randrange(len(other) + 1)
+            mutated[position:] = other[start:]
+        else:
+            mutated.insert(position, rng.randrange(256))
+    return bytes(mutated[:_MAX_INPUT_LENGTH])
+
+
+_simulator: t.Optional[Simulator] = None
+_snapshot: t.Optional[Snapshot] = None
+_coverage: t.Optional[Coverage] = None
+_seen: t.Optional[Coverage] = None
+
+
+def _initialize(template: Simulator):
+    global _simulator, _snapshot, _coverage, _seen
+    _simulator = template
+    _snapshot = template.snapshot()
+    _coverage = Coverage()
+    _seen = Coverage()
+    template.enable_coverage(_coverage)
+
+
+def _run_inputs(
+        task: tuple[list[bytes], int]) -> tuple[int, list[tuple[bytes, ExitReason, int, bytes, bytes]]]:
+    inputs, budget = task
+    assert _simulator is not None and _snapshot is not None and _coverage is not None and _seen is not None
+    findings = []
+    for data in inputs:
+        _coverage.clear()
+        _simulator.restore(_snapshot)
+        _simulator.feed(data)
+        exit_reason = _simulator.run(budget).exit_reason
+        executed = int.from_bytes(_coverage.executed, "little")
+        branches = int.from_bytes(_coverage.branches, "little")
+        new = executed & ~int.from_bytes(_seen.executed, "little") or branches & ~int.from_bytes(_seen.branches, "little")
+        if new:
+            _seen.merge(_coverage)
+        if new or exit_reason in FAULTS:
+            findings.append(
+                (data, exit_reason, _simulator.pc, bytes(_coverage.executed), bytes(_coverage.branches)))
+    return len(inputs), findings
+
+
+def fuzz(
+        template: Simulator,
+        seeds: t.Iterable[bytes] = (b"",),
+        *,
+        executions: int = 100_000,
+        budget: int = 100_000,
+        processes: t.Optional[int] = None,
+        inputs_per_task: int = 256,
+        seed: t.Optional[int] = None) -> FuzzResult:
+    """Fuzzes the console input of the program loaded into ``template``.
+
+    :param seeds: The initial corpus.
+    :param executions: The number of inputs to run in total.
+    :param budget: The maximum number of instructions to execute per input.
+    :param processes: The number of workers; defaults to the number of CPUs.
+    :param seed: Seeds the mutations.
+    """
+    rng = random.Random(seed)
+    processes = processes or os.cpu_count() or 1
+    result = FuzzResult(corpus=[], crashes=[])
+    corpus = list(seeds) or [b""]
+    crash_sites: set[tuple[ExitReason, int]] = set()
+
+    def merge(findings: list[tuple[bytes, ExitReason, int, bytes, bytes]]):
+        for data, exit_reason, pc, executed, branches in findings:
+            coverage = Coverage()
+            coverage.executed[:] = executed
+            coverage.branches[:] = branches
+            covered = result.coverage.covered_count, result.coverage.branch_outcome_count
+            result.coverage.merge(coverage)
+            if (result.coverage.covered_count, result.coverage.branch_outcome_count) != covered:
+                result.corpus.append(data)
+                corpus.append(data)
+            if exit_reason in FAULTS and (exit_reason, pc) not in crash_sites:
+                crash_sites.add((exit_reason, pc))
+                result.crashes.append(Crash(data, exit_reason, pc))
+
+    with _get_context().Pool(processes, _initialize, (template,)) as pool:
+        remaining = executions
+        pending = list(corpus)
+        while remaining > 0:
+            tasks = []
+            for _ in range(processes):
+                count = min(inputs_per_task, remaining)
+                if count <= 0:
+                    break
+                remaining -= count
+                inputs = pending[:count]
+                del pending[:count]
+                inputs += [mutate(rng.choice(corpus), corpus, rng) for _ in range(count - len(inputs))]
+                tasks.append((inputs, budget))
+            for count, findings in pool.imap_unordered(_run_inputs, tasks):
+                result.executions += count
+                merge(findings)
+    return result
@@ -0,0 +1,116 @@
+"""Hot-spot profiling for simulated programs.
+
+A :class:`Profiler` is a tracer: add it with :meth:`Simulator.add_tracer` and it counts
+every instruction the simulator goes on to execute. Effective addresses are worked out
+from the instruction before it runs, so the counts never touch device registers. A
+simulator without tracers runs its untraced dispatch loop and pays nothing for profiling.
+"""
+import array
+from dataclasses import dataclass
+import typing as t
+
+from lc3_py.assembler.assembler import SymbolTable
+
+from .simulator import Simulator, MEMORY_SIZE, PAGE_BITS, PAGE_COUNT
+
+OPCODE_NAMES = (
+    "BR", "ADD", "LD", "ST", "JSR", "AND", "LDR", "STR",
+    "RTI", "NOT", "LDI", "STI", "JMP", "reserved", "LEA", "TRAP")
+
+
+@dataclass(frozen=True)
+class HotSpot:
+    address: int
+    count: int
+    label: t.Optional[str]
+    """The nearest label at or before the address"""
+    offset: int
+    """The distance from ``label`` to the address"""
+    line: t.Optional[int]
+    branches_taken: int
+    branches_not_taken: int
+
+
+class Profiler:
+    def __init__(self):
+        self.executions = array.array("Q", bytes(8 * MEMORY_SIZE))
+        """The number of times each address was executed, indexed by PC"""
+        self.opcodes = array.array("Q", bytes(8 * 16))
+        self.branches_taken = array.array("Q", bytes(8 * MEMORY_SIZE))
+        self.branches_not_taken = array.array("Q", bytes(8 * MEMORY_SIZE))
+        self.page_reads = array.array("Q", bytes(8 * PAGE_COUNT))
+        """Data reads per page; instruction fetches are counted in :attr:`executions`"""
+        self.page_writes = array.array("Q", bytes(8 * PAGE_COUNT))
+
+    def reset(self):
+        self.__init__()
+
+    def trace(self, simulator: Simulator, pc: int, instruction: int):
+        self.executions[pc] += 1
+        opcode = instruction >> 12
+        self.opcodes[opcode] += 1
+        if opcode == 0x0:
+            if (instruction >> 9) & simulator._psr & 0x7:
+                self.branches_taken[pc] += 1
+            else:
+                self.branches_not_taken[pc] += 1
+        elif opcode in (0x2, 0x3, 0xA, 0xB):
+            offset = instruction & 0x1FF
+            address = (pc + 1 + offset - ((offset & 0x100) << 1)) & 0xFFFF
+            if opcode >= 0xA:
+                self.page_reads[address >> PAGE_BITS] += 1
+                address = simulator._memory[address]
+            if opcode & 0x1:
+                self.page_writes[address >> PAGE_BITS] += 1
+            else:
+                self.page_reads[address >> PAGE_BITS] += 1
+        elif opcode == 0x6 or opcode == 0x7:
+            offset = instruction & 0x3F
+            address = (simulator._registers[(instruction >> 6) & 0x7] + offset - ((offset & 0x20) << 1)) & 0xFFFF
+            if opcode == 0x7:
+                self.page_writes[address >> PAGE_BITS] += 1
+            else:
+                self.page_reads[address >> PAGE_BITS] += 1
+
+    @property
+    def opcode_counts(self) -> dict[str, int]:
+        return {name: count for name, count in zip(OPCODE_NAMES, self.opcodes) if count}
+
+    def report(
+            self,
+            symbols: t.Optional[SymbolTable] = None,
+            lines: t.Optional[t.Mapping[int, int]] = None,
+            limit: t.Optional[int] = 20) -> list[HotSpot]:
+        """Gets the most executed addresses, most executed first.
+
+        :param symbols: The program's symbol table, for naming addresses by label.
+        :param lines: A mapping from addresses to source line numbers.
+        :param limit: The maximum number of hot spots to report.
+        """
+        executions = self.executions
+        hot = sorted((address for address in range(MEMORY_SIZE) if executions[address]),
+                     key=lambda address: (-executions[address], address))[:limit]
+        spots = []
+        for address in hot:
+            nearest = symbols.nearest_label(address) if symbols is not None else None
+            spots.append(HotSpot(
+                address=address,
+                count=executions[address],
+                label=nearest[0].value if nearest is not None else None,
+                offset=nearest[1] if nearest is not None else 0,
+                line=lines.get(address) if lines is not None else None,
+                branches_taken=self.branches_taken[address],
+                branches_not_taken=self.branches_not_taken[address]))
+        return spots
+
+
+def format_report(spots: t.Iterable[HotSpot]) -> str:
+    rows = []
+    for spot in spots:
+        location = "" if spot.label is None else spot.label if not spot.offset else f"{spot.label}+{spot.offset}"
+        line = "" if spot.line is None else f"line {spot.line}"
+        branches = ""
+        if spot.branches_taken or spot.branches_not_taken:
+            branches = f"taken {spot.branches_taken}, not taken {spot.branches_not_taken}"
+        rows.append(f"x{spot.address:04X} {spot.count:>12} {location:<20} {line:<10} {branches}".rstrip())
+    return "\n".join(rows)
@@ -0,0 +1,71 @@
+"""Runs one loaded program against many inputs across a process pool.
+
+The loaded machine is built once in the parent and handed to each worker through
+the pool initializer. With the ``fork`` start method the workers inherit it
+copy-on-write; elsewhere it is pickled once per worker. Each worker snapshots the
+machine and restores that snapshot between test cases, so no case reloads the program.
+"""
+from dataclasses import dataclass
+import multiprocessing
+import os
+import typing as t
+
+from .simulator import ExitReason, Registers, Simulator, Snapshot
+
+
+@dataclass(frozen=True)
+class CaseResult:
+    index: int
+    output: bytes
+    registers: Registers
+    exit_reason: ExitReason
+    instruction_count: int
+
+
+_simulator: t.Optional[Simulator] = None
+_snapshot: t.Optional[Snapshot] = None
+
+
+def _initialize(template: Simulator):
+    global _simulator, _snapshot
+    _simulator = template
+    _snapshot = template.snapshot()
+
+
+def _run_case(case: tuple[int, bytes, t.Optional[int], t.Optional[float]]) -> CaseResult:
+    index, data, budget, timeout = case
+    assert _simulator is not None and _snapshot is not None
+    _simulator.restore(_snapshot)
+    _simulator.feed(data)
+    result = _simulator.run(budget, timeout)
+    return CaseResult(
+        index=index,
+        output=_simulator.output,
+        registers=_simulator.registers,
+        exit_reason=result.exit_reason,
+        instruction_count=result.instruction_count)
+
+
+def _get_context():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def run_batch(
+        template: Simulator,
+        inputs: t.Iterable[bytes],
+        *,
+        budget: t.Optional[int] = None,
+        timeout: t.Optional[float] = None,
+        processes: t.Optional[int] = None,
+        chunksize: int = 1) -> t.Iterator[CaseResult]:
+    """Runs ``template`` once per input, yielding results in the order they complete.
+
+    :param budget: The maximum number of instructions to execute per input.
+    :param timeout: The maximum number of seconds to run per input.
+    :param processes: The number of workers; defaults to the number of CPUs.
+    """
+    cases = ((index, data, budget, timeout) for index, data in enumerate(inputs))
+    with _get_context().Pool(processes or os.cpu_count(), _initialize, (template,)) as pool:
+        yield from pool.imap_unordered(_run_case, cases, chunksize)
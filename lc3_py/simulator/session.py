@@ -0,0 +1,76 @@
+"""Runs simulators as asyncio tasks so one event loop can serve many interactive consoles.
+
+A session runs its machine in short slices, yielding to the event loop between them.
+When the program asks for a key (GETC, IN, or polling KBSR) the session awaits its
+reader instead of spinning, and everything written to the display is streamed to its
+writer as it appears. Idle sessions therefore cost nothing but their memory.
+"""
+import asyncio
+import typing as t
+
+from .simulator import ExitReason, RunResult, Simulator
+
+_SLICE_SIZE = 4096
+_READ_SIZE = 4096
+
+
+class AsyncReader(t.Protocol):
+    async def read(self, n: int = -1, /) -> bytes: ...
+
+class AsyncWriter(t.Protocol):
+    def write(self, data: bytes, /) -> None: ...
+    async def drain(self) -> None: ...
+
+
+async def run_session(
+        simulator: Simulator,
+        reader: AsyncReader,
+        writer: AsyncWriter,
+        *,
+        slice_size: int = _SLICE_SIZE,
+        budget: t.Optional[int] = None,
+        timeout: t.Optional[float] = None) -> RunResult:
+    """Runs ``simulator`` until it stops, feeding it from ``reader`` and streaming its output to ``writer``.
+
+    The session ends with :attr:`ExitReason.WAITING_FOR_INPUT` if the reader reaches end of file
+    while the program is waiting for a key.
+
+    :param slice_size: The number of instructions to run before yielding to other tasks.
+    :param budget: The maximum number of instructions to execute.
+    :param timeout: The maximum number of seconds the session may last, including time spent waiting.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    waited_for_keyboard = simulator.wait_for_keyboard
+    simulator.wait_for_keyboard = True
+    sent = simulator.output_length
+    executed = 0
+    try:
+        while True:
+            size = slice_size if budget is None else min(slice_size, budget - executed)
+            if size <= 0:
+                return RunResult(ExitReason.BUDGET_EXHAUSTED, executed)
+            result = simulator.run(size)
+            executed += result.instruction_count
+            if simulator.output_length > sent:
+                writer.write(simulator.output_since(sent))
+                sent = simulator.output_length
+                await writer.drain()
+
+            if result.exit_reason == ExitReason.WAITING_FOR_INPUT:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        data = await reader.read(_READ_SIZE)
+                except TimeoutError:
+                    return RunResult(ExitReason.TIMEOUT, executed)
+                if not data:
+                    return RunResult(result.exit_reason, executed)
+                simulator.feed(data)
+            elif result.exit_reason != ExitReason.BUDGET_EXHAUSTED:
+                return RunResult(result.exit_reason, executed)
+            elif deadline is not None and loop.time() >= deadline:
+                return RunResult(ExitReason.TIMEOUT, executed)
+            else:
+                await asyncio.sleep(0)
+    finally:
+        simulator.wait_for_keyboard = waited_for_keyboard
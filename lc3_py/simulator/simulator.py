@@ -0,0 +1,759 @@
+"""An LC-3 simulator following the third-edition ISA.
+
+TRAP pushes the PSR and PC onto the supervisor stack and jumps through the
+trap vector table, so an operating system image can be loaded as usual. When
+the table entry for a vector is zero (no OS loaded) the standard service
+routines are emulated natively instead.
+
+Memory accesses go through a page table with one entry per 512-word page. Plain
+memory pages have no entry, so loads and stores only look further when they hit
+the device page or, in user mode, a page below ``MIN_USER_ADDRESS``.
+"""
+import array
+import copy
+from dataclasses import dataclass
+import heapq
+import mmap
+import os
+import sys
+import time
+import typing as t
+
+from lc3_py.system_constants import MIN_USER_ADDRESS, MAX_ADDRESS, MIN_DEVICE_ADDRESS, INTERRUPT_VECTOR_TABLE
+
+from .devices import Device, Keyboard, Display, MachineControl, Timer
+from .exit_reason import ExitReason, MachineStop
+from .undo import UndoLog
+
+if t.TYPE_CHECKING:
+    from lc3_py.assembler.image import Image
+    from .coverage import Coverage
+
+MEMORY_SIZE = MAX_ADDRESS + 1
+PAGE_BITS = 9
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_COUNT = MEMORY_SIZE >> PAGE_BITS
+
+_USER_MODE = 0x8000
+_PRIORITY = 0x0700
+
+_N, _Z, _P = 4, 2, 1
+_CONDITION_CODES = bytes([_Z] + [_P] * 0x7FFF + [_N] * 0x8000)
+
+_IN_PROMPT = b"\nInput a character> "
+
+_BATCH_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class RunResult:
+    exit_reason: ExitReason
+    instruction_count: int
+    """The number of instructions completed during the run"""
+
+
+@dataclass(frozen=True, eq=False)
+class Snapshot:
+    """The complete state of a :class:`Simulator`; the arrays must not be mutated"""
+    memory: array.array[int]
+    registers: tuple[int, ...]
+    pc: int
+    psr: int
+    saved_ssp: int
+    saved_usp: int
+    instruction_count: int
+    devices: tuple[t.Any, ...]
+    events: tuple[tuple[int, int, int, int], ...]
+    event_sequence: int
+
+
+@dataclass(frozen=True)
+class Registers:
+    values: tuple[int, int, int, int, int, int, int, int]
+    pc: int
+    psr: int
+
+
+class Tracer(t.Protocol):
+    def trace(self, simulator: Simulator, pc: int, instruction: int, /) -> None:
+        """Called before each instruction executes, including one that then faults"""
+        ...
+
+
+class _Page(t.Protocol):
+    def read(self, simulator: Simulator, address: int, /) -> int: ...
+    def write(self, simulator: Simulator, address: int, value: int, /) -> None: ...
+
+class _ProtectedPage:
+    def read(self, simulator: Simulator, address: int) -> int:
+        raise MachineStop(ExitReason.ACCESS_VIOLATION)
+    def write(self, simulator: Simulator, address: int, value: int):
+        raise MachineStop(ExitReason.ACCESS_VIOLATION)
+
+class _DevicePage:
+    def __init__(self, devices: t.Iterable[Device]):
+        self._devices = {address: device for device in devices for address in device.addresses}
+    def read(self, simulator: Simulator, address: int) -> int:
+        device = self._devices.get(address)
+        if device is None:
+            return simulator._memory[address]
+        return device.read(simulator, address)
+    def write(self, simulator: Simulator, address: int, value: int):
+        device = self._devices.get(address)
+        if device is None:
+            simulator._memory[address] = value
+            simulator._dirty[address >> PAGE_BITS] = 1
+        else:
+            device.write(simulator, address, value)
+
+
+class Simulator:
+    def __init__(self, *, wait_for_keyboard: bool = False):
+        """
+        :param wait_for_keyboard: If true, reading KBSR while no input is pending stops the
+            machine with :attr:`ExitReason.WAITING_FOR_INPUT`, as GETC and IN always do, instead of
+            letting the program poll.
+        """
+        self._memory = array.array("H", bytes(2 * MEMORY_SIZE))
+        self._registers = [0] * 8
+        self._pc = MIN_USER_ADDRESS
+        self._psr = _USER_MODE | _Z
+        self._saved_ssp = MIN_USER_ADDRESS
+        self._saved_usp = 0
+        self._instruction_count = 0
+        self._dirty = bytearray(PAGE_COUNT)
+        self._dirty_base: t.Optional[Snapshot] = None
+        self._undo: t.Optional[UndoLog] = None
+        self._tracers: list[Tracer] = []
+        self._coverage: t.Optional[Coverage] = None
+
+        self._keyboard = Keyboard()
+        self._keyboard.wait = wait_for_keyboard
+        self._display = Display()
+        self._control = MachineControl()
+        self._devices: list[Device] = [self._keyboard, self._display, self._control, Timer()]
+        self._events: list[tuple[int, int, int, int]] = []
+        self._event_sequence = 0
+        self._deferred_events: list[tuple[int, int, int]] = []
+        self._in_batch = False
+        self._check_interrupts = False
+        self._map_devices()
+
+    @property
+    def pc(self) -> int:
+        return self._pc
+    @pc.setter
+    def pc(self, value: int):
+        self._pc = value & 0xFFFF
+
+    @property
+    def psr(self) -> int:
+        return self._psr
+    @psr.setter
+    def psr(self, value: int):
+        self._set_psr(value & 0xFFFF)
+        self._check_interrupts = True
+
+    @property
+    def registers(self) -> Registers:
+        return Registers(tuple(self._registers), self._pc, self._psr) # type: ignore
+
+    def get_register(self, index: int) -> int:
+        return self._registers[index]
+    def set_register(self, index: int, value: int):
+        self._registers[index] = value & 0xFFFF
+
+    @property
+    def instruction_count(self) -> int:
+        """The number of instructions that have completed since the simulator was created"""
+        return self._instruction_count
+
+    @property
+    def halted(self) -> bool:
+        return not self._control.running
+
+    @property
+    def wait_for_keyboard(self) -> bool:
+        return self._keyboard.wait
+    @wait_for_keyboard.setter
+    def wait_for_keyboard(self, value: bool):
+        self._keyboard.wait = value
+
+    @property
+    def output(self) -> bytes:
+        return bytes(self._display.output)
+
+    @property
+    def output_length(self) -> int:
+        return len(self._display.output)
+
+    def output_since(self, start: int) -> bytes:
+        """Gets the output written after the first ``start`` bytes"""
+        return bytes(self._display.output[start:])
+
+    def feed(self, data: bytes):
+        """Appends ``data`` to the pending keyboard input"""
+        self._keyboard.feed(self, data)
+
+    @property
+    def devices(self) -> tuple[Device, ...]:
+        return tuple(self._devices)
+
+    def attach(self, device: Device):
+        """Maps ``device`` into the device page"""
+        taken = {address for attached in self._devices for address in attached.addresses}
+        for address in device.addresses:
+            if not MIN_DEVICE_ADDRESS <= address <= MAX_ADDRESS:
+                raise ValueError(f"device register x{address:X} is outside of the device page")
+            if address in taken:
+                raise ValueError(f"device register x{address:X} is already in use")
+        self._devices.append(device)
+        self._map_devices()
+
+    def schedule(self, delay: int, device: Device, token: int = 0):
+        """Calls ``device.fire(self, token)`` once ``delay`` more instructions have completed.
+
+        When called while instructions are executing, this ends the current batch so that the
+        delay is counted from the exact instruction; devices must call it last when handling a write.
+        """
+        index = self._devices.index(device)
+        if self._in_batch:
+            self._deferred_events.append((delay, index, token))
+            raise MachineStop(None, completed=True)
+        heapq.heappush(self._events, (self._instruction_count + delay, self._event_sequence, index, token))
+        self._event_sequence += 1
+
+    def load(self, origin: int, words: t.Sequence[int]):
+        """Copies ``words`` into memory starting at ``origin``"""
+        if not (0 <= origin and origin + len(words) <= MEMORY_SIZE):
+            raise ValueError(f"{len(words)} words at x{origin:X} do not fit in memory")
+        if not (isinstance(words, array.array) and words.typecode == "H"):
+            words = array.array("H", words)
+        self._memory[origin:origin + len(words)] = words
+        self._mark_dirty(origin, origin + len(words))
+
+    def load_image(self, image: Image):
+        """Copies each segment of an assembled image into memory, zeroing its reserved words"""
+        for segment in image.segments:
+            self.load(segment.origin, segment.words)
+            start = segment.origin + len(segment.words)
+            self._memory[start:segment.end] = array.array("H", bytes(2 * segment.reserved))
+            self._mark_dirty(start, segment.end)
+
+    def load_object(self, path: str | os.PathLike[str]) -> int:
+        """Loads an ``.obj`` file, a big-endian origin followed by big-endian words, returning the origin.
+
+        The words are copied from the mapped file straight into memory, swapping bytes on the way
+        on little-endian hosts.
+        """
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < 2 or size % 2:
+                raise ValueError(f"{path} is not an object file: it has {size} bytes")
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                origin = int.from_bytes(view[:2], "big")
+                end = origin + size // 2 - 1
+                if end > MEMORY_SIZE:
+                    raise ValueError(f"{end - origin} words at x{origin:X} do not fit in memory")
+                with memoryview(self._memory).cast("B")[2 * origin:2 * end] as target, view[2:] as source:
+                    if sys.byteorder == "little":
+                        target[0::2] = source[1::2]
+                        target[1::2] = source[0::2]
+                    else:
+                        target[:] = source
+        self._mark_dirty(origin, end)
+        return origin
+
+    def read(self, address: int) -> int:
+        """Reads a word of memory without side effects"""
+        return self._memory[address]
+
+    def memory_view(self, start: int = 0, end: int = MEMORY_SIZE) -> memoryview:
+        """Gets a read-only view of the words from ``start`` up to ``end`` without copying them.
+
+        The view has format ``"H"`` and is laid out in the host's native byte order
+        (``sys.byteorder``), so ``numpy.frombuffer(view, numpy.uint16)`` wraps it directly. It
+        stays live: later writes to memory show through it.
+        """
+        if not 0 <= start <= end <= MEMORY_SIZE:
+            raise ValueError(f"invalid address range x{start:X} to x{end:X}")
+        return memoryview(self._memory).toreadonly()[start:end]
+
+    def __buffer__(self, flags: int = 0) -> memoryview:
+        return self.memory_view()
+
+    def copy(self) -> Simulator:
+        other = Simulator.__new__(Simulator)
+        other.__dict__.update(self.__dict__)
+        other._memory = array.array("H", self._memory)
+        other._registers = list(self._registers)
+        other._dirty = bytearray(self._dirty)
+        other._undo = None
+        other._tracers = []
+        other._coverage = None
+        other._devices = copy.deepcopy(self._devices)
+        other._keyboard, other._display, other._control = other._devices[:3] # type: ignore
+        other._events = list(self._events)
+        other._deferred_events = []
+        other._map_devices()
+        return other
+
+    def snapshot(self) -> Snapshot:
+        """Captures memory, registers, PC, PSR and device state"""
+        snapshot = self._capture()
+        self._dirty[:] = bytes(PAGE_COUNT)
+        self._dirty_base = snapshot
+        return snapshot
+
+    def restore(self, snapshot: Snapshot):
+        """Returns the machine to the state captured by ``snapshot``.
+
+        Memory pages written since the most recent snapshot or restore are tracked, so
+        returning to that same snapshot only copies the pages that were touched.
+        Any undo history is discarded.
+        """
+        self._restore_state(snapshot)
+        if self._undo is not None:
+            self._undo.clear()
+
+    def enable_undo(self, checkpoint_interval: int = 65536):
+        """Starts recording every executed instruction so that it can be undone.
+
+        :param checkpoint_interval: The number of instructions between full checkpoints,
+            which bounds the cost of stepping far backwards.
+        """
+        self.disable_undo()
+        self._undo = UndoLog(checkpoint_interval)
+        self._tracers.insert(0, self._undo)
+
+    def disable_undo(self):
+        if self._undo is not None:
+            self._tracers.remove(self._undo)
+        self._undo = None
+
+    def enable_coverage(self, coverage: Coverage):
+        """Marks every executed instruction and branch outcome in ``coverage``.
+
+        Coverage is marked by its own dispatch loop rather than through a tracer, so it only costs a
+        few bit operations per instruction.
+        """
+        self._coverage = coverage
+
+    def disable_coverage(self):
+        self._coverage = None
+
+    def add_tracer(self, tracer: Tracer):
+        """Calls ``tracer`` before every instruction.
+
+        Tracing runs in a separate dispatch loop, so a simulator with no tracers pays nothing for it.
+        """
+        self._tracers.append(tracer)
+
+    def remove_tracer(self, tracer: Tracer):
+        self._tracers.remove(tracer)
+
+    def step_back(self, count: int = 1) -> int:
+        """Undoes the last ``count`` instructions, returning how many could be undone"""
+        if self._undo is None:
+            raise RuntimeError("undo recording is not enabled")
+        return self._undo.step_back(self, count)
+
+    def run_back_to(self, address: int) -> int:
+        """Undoes instructions until the PC reaches ``address``, returning how many were undone"""
+        if self._undo is None:
+            raise RuntimeError("undo recording is not enabled")
+        return self._undo.run_back_to(self, address)
+
+    def _capture(self) -> Snapshot:
+        return Snapshot(
+            memory=array.array("H", self._memory),
+            registers=tuple(self._registers),
+            pc=self._pc,
+            psr=self._psr,
+            saved_ssp=self._saved_ssp,
+            saved_usp=self._saved_usp,
+            instruction_count=self._instruction_count,
+            devices=tuple(device.save() for device in self._devices),
+            events=tuple(self._events),
+            event_sequence=self._event_sequence)
+
+    def _restore_state(self, snapshot: Snapshot):
+        if len(snapshot.devices) != len(self._devices):
+            raise ValueError("the snapshot was taken with a different set of devices")
+        if self._dirty_base is snapshot:
+            memory = memoryview(self._memory)
+            saved = memoryview(snapshot.memory)
+            page = self._dirty.find(1)
+            while page != -1:
+                start = page << PAGE_BITS
+                memory[start:start + PAGE_SIZE] = saved[start:start + PAGE_SIZE]
+                page = self._dirty.find(1, page + 1)
+        else:
+            memoryview(self._memory)[:] = memoryview(snapshot.memory)
+        self._dirty[:] = bytes(PAGE_COUNT)
+        self._dirty_base = snapshot
+        self._registers[:] = snapshot.registers
+        self._pc = snapshot.pc
+        self._set_psr(snapshot.psr)
+        self._saved_ssp = snapshot.saved_ssp
+        self._saved_usp = snapshot.saved_usp
+        self._instruction_count = snapshot.instruction_count
+        for device, state in zip(self._devices, snapshot.devices):
+            device.restore(state)
+        self._events[:] = snapshot.events
+        self._event_sequence = snapshot.event_sequence
+        self._deferred_events.clear()
+
+    def step(self) -> t.Optional[ExitReason]:
+        """Executes one instruction, returning the reason the machine stopped, if it did"""
+        if not self._control.running:
+            return ExitReason.HALT
+        self._service_events()
+        run_batch = self._batch_runner()
+        return run_batch(1)[1]
+
+    def run(self, budget: t.Optional[int] = None, timeout: t.Optional[float] = None) -> RunResult:
+        """Runs until the machine stops, ``budget`` instructions have executed, or ``timeout`` seconds have passed.
+
+        Limits are checked between fixed-size batches of instructions rather than after every one;
+        the final batch is shortened so that the budget is never overrun. Batches are also cut
+        short to end exactly when the next scheduled device event is due.
+        """
+        if not self._control.running:
+            return RunResult(ExitReason.HALT, 0)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        executed = 0
+        run_batch = self._batch_runner()
+        while True:
+            batch = _BATCH_SIZE if budget is None else min(_BATCH_SIZE, budget - executed)
+            if batch <= 0:
+                return RunResult(ExitReason.BUDGET_EXHAUSTED, executed)
+            # Events are serviced just before the next instruction, as in step, never after the last one.
+            self._service_events()
+            if self._events:
+                batch = min(batch, self._events[0][0] - self._instruction_count)
+            completed, reason = run_batch(batch)
+            executed += completed
+            if reason is not None:
+                return RunResult(reason, executed)
+            if deadline is not None and time.monotonic() >= deadline:
+                return RunResult(ExitReason.TIMEOUT, executed)
+
+    def _batch_runner(self) -> t.Callable[[int], tuple[int, t.Optional[ExitReason]]]:
+        if self._tracers:
+            return self._run_traced_batch
+        if self._coverage is not None:
+            return self._run_covered_batch
+        return self._run_batch
+
+    def _run_batch(self, count: int) -> tuple[int, t.Optional[ExitReason]]:
+        handlers = self._HANDLERS
+        completed = 0
+        pc = self._pc
+        self._in_batch = True
+        try:
+            for completed in range(count):
+                pc = self._pc
+                instruction = self._read(pc)
+                self._pc = (pc + 1) & 0xFFFF
+                handlers[instruction >> 12](self, instruction)
+        except MachineStop as stop:
+            self._in_batch = False
+            if stop.completed:
+                completed += 1
+            else:
+                self._pc = pc
+            self._instruction_count += completed
+            return completed, stop.reason
+        self._in_batch = False
+        self._instruction_count += count
+        return count, None
+
+    def _run_traced_batch(self, count: int) -> tuple[int, t.Optional[ExitReason]]:
+        handlers = self._HANDLERS
+        tracers = tuple(self._tracers) if self._coverage is None else (*self._tracers, self._coverage)
+        undo = self._undo
+        start = 0 if undo is None else len(undo)
+        completed = 0
+        pc = self._pc
+        self._in_batch = True
+        try:
+            for completed in range(count):
+                pc = self._pc
+                instruction = self._read(pc)
+                for tracer in tracers:
+                    tracer.trace(self, pc, instruction)
+                self._pc = (pc + 1) & 0xFFFF
+                handlers[instruction >> 12](self, instruction)
+        except MachineStop as stop:
+            self._in_batch = False
+            if stop.completed:
+                completed += 1
+            else:
+                self._pc = pc
+            if undo is not None:
+                undo.abandon(start + completed)
+            self._instruction_count += completed
+            return completed, stop.reason
+        self._in_batch = False
+        self._instruction_count += count
+        return count, None
+
+    def _run_covered_batch(self, count: int) -> tuple[int, t.Optional[ExitReason]]:
+        assert self._coverage is not None
+        handlers = self._HANDLERS
+        executed = self._coverage.executed
+        branches = self._coverage.branches
+        completed = 0
+        pc = self._pc
+        self._in_batch = True
+        try:
+            for completed in range(count):
+                pc = self._pc
+                instruction = self._read(pc)
+                executed[pc >> 3] |= 1 << (pc & 0x7)
+                opcode = instruction >> 12
+                if opcode:
+                    self._pc = (pc + 1) & 0xFFFF
+                    handlers[opcode](self, instruction)
+                elif (instruction >> 9) & self._psr & 0x7:
+                    # BR is executed inline, as marking its outcome needs the same test.
+                    offset = instruction & 0x1FF
+                    self._pc = (pc + 1 + offset - ((offset & 0x100) << 1)) & 0xFFFF
+                    branches[pc >> 2] |= 1 << ((pc & 0x3) << 1)
+                else:
+                    self._pc = (pc + 1) & 0xFFFF
+                    branches[pc >> 2] |= 2 << ((pc & 0x3) << 1)
+        except MachineStop as stop:
+            self._in_batch = False
+            if stop.completed:
+                completed += 1
+            else:
+                self._pc = pc
+            self._instruction_count += completed
+            return completed, stop.reason
+        self._in_batch = False
+        self._instruction_count += count
+        return count, None
+
+    def _service_events(self):
+        count = self._instruction_count
+        if not (self._check_interrupts or self._deferred_events or (self._events and self._events[0][0] <= count)):
+            return
+        if self._undo is not None:
+            self._undo.record_service(self)
+        for delay, index, token in self._deferred_events:
+            heapq.heappush(self._events, (count + delay, self._event_sequence, index, token))
+            self._event_sequence += 1
+        self._deferred_events.clear()
+        while self._events and self._events[0][0] <= count:
+            _, _, index, token = heapq.heappop(self._events)
+            self._devices[index].fire(self, token)
+        self._check_interrupts = False
+
+        requests = [request for device in self._devices if (request := device.interrupt_request())]
+        if requests and self._control.running:
+            vector, priority = max(requests, key=lambda request: request[1])
+            if priority > (self._psr & _PRIORITY) >> 8:
+                self._enter_supervisor(INTERRUPT_VECTOR_TABLE + vector, priority)
+
+    def _map_devices(self):
+        device_page = _DevicePage(self._devices)
+        protected = _ProtectedPage()
+        self._supervisor_pages: list[t.Optional[_Page]] = [None] * PAGE_COUNT
+        self._supervisor_pages[MIN_DEVICE_ADDRESS >> PAGE_BITS] = device_page
+        self._user_pages = list(self._supervisor_pages)
+        self._user_pages[:MIN_USER_ADDRESS >> PAGE_BITS] = [protected] * (MIN_USER_ADDRESS >> PAGE_BITS)
+        self._pages = self._user_pages if self._psr & _USER_MODE else self._supervisor_pages
+
+    def _set_psr(self, psr: int):
+        self._psr = psr
+        self._pages = self._user_pages if psr & _USER_MODE else self._supervisor_pages
+
+    def _read(self, address: int) -> int:
+        page = self._pages[address >> PAGE_BITS]
+        if page is None:
+            return self._memory[address]
+        return page.read(self, address)
+
+    def _write(self, address: int, value: int):
+        page = self._pages[address >> PAGE_BITS]
+        if page is None:
+            self._memory[address] = value
+            self._dirty[address >> PAGE_BITS] = 1
+        else:
+            page.write(self, address, value)
+
+    def _mark_dirty(self, start: int, end: int):
+        if start >= end:
+            return
+        first, last = start >> PAGE_BITS, ((end - 1) >> PAGE_BITS) + 1
+        self._dirty[first:last] = b"\x01" * (last - first)
+
+    def _set_condition_codes(self, value: int):
+        self._psr = (self._psr & 0xFFF8) | _CONDITION_CODES[value]
+
+    def _push(self, value: int):
+        self._registers[6] = (self._registers[6] - 1) & 0xFFFF
+        self._memory[self._registers[6]] = value
+        self._dirty[self._registers[6] >> PAGE_BITS] = 1
+
+    def _enter_supervisor(self, vector_address: int, priority: t.Optional[int] = None):
+        """Switches to the supervisor stack, saves the PSR and PC, and jumps through ``vector_address``"""
+        psr = self._psr
+        if psr & _USER_MODE:
+            self._saved_usp = self._registers[6]
+            self._registers[6] = self._saved_ssp
+        self._push(psr)
+        self._push(self._pc)
+        new_psr = psr & ~_USER_MODE & 0xFFFF
+        if priority is not None:
+            new_psr = (new_psr & ~_PRIORITY) | (priority << 8)
+        self._set_psr(new_psr)
+        self._pc = self._memory[vector_address]
+
+    def _br(self, instruction: int):
+        if (instruction >> 9) & self._psr & 0x7:
+            offset = instruction & 0x1FF
+            self._pc = (self._pc + offset - ((offset & 0x100) << 1)) & 0xFFFF
+
+    def _add(self, instruction: int):
+        registers = self._registers
+        if instruction & 0x20:
+            operand = (instruction & 0x1F) - ((instruction & 0x10) << 1)
+        else:
+            operand = registers[instruction & 0x7]
+        value = (registers[(instruction >> 6) & 0x7] + operand) & 0xFFFF
+        registers[(instruction >> 9) & 0x7] = value
+        self._set_condition_codes(value)
+
+    def _ld(self, instruction: int):
+        offset = instruction & 0x1FF
+        value = self._read((self._pc + offset - ((offset & 0x100) << 1)) & 0xFFFF)
+        self._registers[(instruction >> 9) & 0x7] = value
+        self._set_condition_codes(value)
+
+    def _st(self, instruction: int):
+        offset = instruction & 0x1FF
+        self._write((self._pc + offset - ((offset & 0x100) << 1)) & 0xFFFF, self._registers[(instruction >> 9) & 0x7])
+
+    def _jsr(self, instruction: int):
+        pc = self._pc
+        if instruction & 0x800:
+            offset = instruction & 0x7FF
+            self._pc = (pc + offset - ((offset & 0x400) << 1)) & 0xFFFF
+        else:
+            self._pc = self._registers[(instruction >> 6) & 0x7]
+        self._registers[7] = pc
+
+    def _and(self, instruction: int):
+        registers = self._registers
+        if instruction & 0x20:
+            operand = ((instruction & 0x1F) - ((instruction & 0x10) << 1)) & 0xFFFF
+        else:
+            operand = registers[instruction & 0x7]
+        value = registers[(instruction >> 6) & 0x7] & operand
+        registers[(instruction >> 9) & 0x7] = value
+        self._set_condition_codes(value)
+
+    def _ldr(self, instruction: int):
+        offset = instruction & 0x3F
+        value = self._read((self._registers[(instruction >> 6) & 0x7] + offset - ((offset & 0x20) << 1)) & 0xFFFF)
+        self._registers[(instruction >> 9) & 0x7] = value
+        self._set_condition_codes(value)
+
+    def _str(self, instruction: int):
+        offset = instruction & 0x3F
+        self._write(
+            (self._registers[(instruction >> 6) & 0x7] + offset - ((offset & 0x20) << 1)) & 0xFFFF,
+            self._registers[(instruction >> 9) & 0x7])
+
+    def _rti(self, instruction: int):
+        if self._psr & _USER_MODE:
+            raise MachineStop(ExitReason.PRIVILEGE_VIOLATION)
+        registers = self._registers
+        stack = registers[6]
+        self._pc = self._memory[stack]
+        psr = self._memory[(stack + 1) & 0xFFFF]
+        registers[6] = (stack + 2) & 0xFFFF
+        if psr & _USER_MODE:
+            self._saved_ssp = registers[6]
+            registers[6] = self._saved_usp
+        self._set_psr(psr)
+        if any(device.interrupt_request() for device in self._devices):
+            self._check_interrupts = True
+            raise MachineStop(None, completed=True)
+
+    def _not(self, instruction: int):
+        value = self._registers[(instruction >> 6) & 0x7] ^ 0xFFFF
+        self._registers[(instruction >> 9) & 0x7] = value
+        self._set_condition_codes(value)
+
+    def _ldi(self, instruction: int):
+        offset = instruction & 0x1FF
+        value = self._read(self._read((self._pc + offset - ((offset & 0x100) << 1)) & 0xFFFF))
+        self._registers[(instruction >> 9) & 0x7] = value
+        self._set_condition_codes(value)
+
+    def _sti(self, instruction: int):
+        offset = instruction & 0x1FF
+        self._write(self._read((self._pc + offset - ((offset & 0x100) << 1)) & 0xFFFF), self._registers[(instruction >> 9) & 0x7])
+
+    def _jmp(self, instruction: int):
+        self._pc = self._registers[(instruction >> 6) & 0x7]
+
+    def _reserved(self, instruction: int) -> None:
+        raise MachineStop(ExitReason.INVALID_OPCODE)
+
+    def _lea(self, instruction: int):
+        offset = instruction & 0x1FF
+        self._registers[(instruction >> 9) & 0x7] = (self._pc + offset - ((offset & 0x100) << 1)) & 0xFFFF
+
+    def _trap(self, instruction: int):
+        vector = instruction & 0xFF
+        if self._memory[vector]:
+            self._enter_supervisor(vector)
+        else:
+            self._native_trap(vector)
+
+    def _native_trap(self, vector: int):
+        registers = self._registers
+        output = self._display.output
+        if vector == 0x20:
+            registers[0] = self._keyboard.getc()
+        elif vector == 0x21:
+            output.append(registers[0] & 0xFF)
+        elif vector == 0x22:
+            address = registers[0]
+            while character := self._memory[address]:
+                output.append(character & 0xFF)
+                address = (address + 1) & 0xFFFF
+        elif vector == 0x23:
+            character = self._keyboard.getc()
+            output += _IN_PROMPT
+            output.append(character)
+            output.append(ord("\n"))
+            registers[0] = character
+        elif vector == 0x24:
+            address = registers[0]
+            while word := self._memory[address]:
+                output.append(word & 0xFF)
+                if word >> 8:
+                    output.append(word >> 8)
+                address = (address + 1) & 0xFFFF
+        elif vector == 0x25:
+            self._control.halt()
+        else:
+            raise MachineStop(ExitReason.UNKNOWN_TRAP)
+
+    _HANDLERS: t.ClassVar[tuple[t.Callable[[Simulator, int], None], ...]]
+    """The instruction handlers, indexed by opcode"""
+
+
+# Taken from the finished class, so that the handlers' ``self`` is a Simulator rather than Self.
+Simulator._HANDLERS = (
+    Simulator._br, Simulator._add, Simulator._ld, Simulator._st,
+    Simulator._jsr, Simulator._and, Simulator._ldr, Simulator._str,
+    Simulator._rti, Simulator._not, Simulator._ldi, Simulator._sti,
+    Simulator._jmp, Simulator._reserved, Simulator._lea, Simulator._trap,
+)
@@ -0,0 +1,284 @@
+"""A compact per-instruction undo log for stepping a :class:`Simulator` backwards.
+
+Each entry holds what one instruction overwrote: the previous PC and PSR, at most
+one register, at most one memory word, and the console positions. Entries live in
+parallel packed arrays. Instructions with wider effects add a record to the entry:
+TRAP through the vector table, RTI and taking an interrupt record the PC, PSR, R6,
+the saved stack pointers and the two stack words a push would overwrite, and accesses
+to device registers other than the keyboard and display also record the devices'
+state and the pending events. So does servicing device events before an instruction.
+A full checkpoint is taken every ``checkpoint_interval`` entries so that long jumps
+backwards restore one checkpoint and unwind at most one interval.
+"""
+import array
+import bisect
+import dataclasses
+import typing as t
+
+from lc3_py.system_constants import MIN_DEVICE_ADDRESS, KBSR, KBDR, DSR, DDR
+
+if t.TYPE_CHECKING:
+    from .simulator import Simulator, Snapshot
+
+_NONE = -1
+_WRITES_DESTINATION = frozenset([0x1, 0x2, 0x5, 0x6, 0x9, 0xA, 0xE])
+_LOADS = frozenset([0x2, 0x6, 0xA])
+_RECORDED_DEVICE_READS = frozenset([KBSR, KBDR, DSR])
+_STORES = frozenset([0x3, 0x7, 0xB])
+_NATIVE_INPUT_TRAPS = frozenset([0x20, 0x23])
+_HALT_TRAP = 0x25
+_USER_MODE = 0x8000
+_RECORD_SIZE = 9
+"""PC, PSR, R6, saved SSP, saved USP, and two stack addresses with their previous values"""
+
+_DeviceState: t.TypeAlias = tuple[tuple[t.Any, ...], tuple[tuple[int, int, int, int], ...], int, tuple[tuple[int, int, int], ...]]
+
+
+def _save_devices(simulator: Simulator) -> _DeviceState:
+    # The keyboard's input position and the display's output are already in every entry.
+    states = tuple(
+        simulator._keyboard._interrupt_enable if device is simulator._keyboard
+        else None if device is simulator._display
+        else device.save()
+        for device in simulator._devices)
+    return states, tuple(simulator._events), simulator._event_sequence, tuple(simulator._deferred_events)
+
+
+def _restore_devices(simulator: Simulator, state: _DeviceState):
+    states, events, event_sequence, deferred_events = state
+    for device, device_state in zip(simulator._devices, states):
+        if device is simulator._keyboard:
+            simulator._keyboard._interrupt_enable = device_state
+        elif device is not simulator._display:
+            device.restore(device_state)
+    simulator._events[:] = events
+    simulator._event_sequence = event_sequence
+    simulator._deferred_events[:] = deferred_events
+    simulator._check_interrupts = True
+
+
+class UndoLog:
+    def __init__(self, checkpoint_interval: int = 65536):
+        if checkpoint_interval <= 0:
+            raise ValueError("checkpoint interval must be positive")
+        self._checkpoint_interval = checkpoint_interval
+        self._pcs = array.array("H")
+        self._psrs = array.array("H")
+        self._registers = array.array("b")
+        self._register_values = array.array("H")
+        self._addresses = array.array("i")
+        self._memory_values = array.array("H")
+        self._input_positions = array.array("Q")
+        self._output_lengths = array.array("Q")
+        self._record_indices = array.array("Q")
+        """The entry each record belongs to, in the order they were recorded"""
+        self._records = array.array("i")
+        self._device_states: list[t.Optional[_DeviceState]] = []
+        """Parallel to :attr:`_record_indices`"""
+        self._traced_records = 0
+        """The number of records before the last traced instruction's own"""
+        self._first_count = 0
+        """The instruction count before the first entry; counts are only updated between batches"""
+        self._checkpoint_indices: list[int] = []
+        self._checkpoints: dict[int, Snapshot] = {}
+
+    def __len__(self) -> int:
+        return len(self._pcs)
+
+    def clear(self):
+        self.truncate(0)
+
+    def record_service(self, simulator: Simulator):
+        """Records the state that servicing events and interrupts before the next instruction may change"""
+        self._record(simulator, True, True)
+
+    def truncate(self, length: int):
+        """Discards every entry from ``length`` onwards"""
+        for entries in (
+                self._pcs, self._psrs, self._registers, self._register_values,
+                self._addresses, self._memory_values, self._input_positions, self._output_lengths):
+            del entries[length:]
+        cut = bisect.bisect_left(self._record_indices, length)
+        del self._record_indices[cut:]
+        del self._records[cut * _RECORD_SIZE:]
+        del self._device_states[cut:]
+        cut = bisect.bisect_left(self._checkpoint_indices, length)
+        for index in self._checkpoint_indices[cut:]:
+            del self._checkpoints[index]
+        del self._checkpoint_indices[cut:]
+
+    def abandon(self, length: int):
+        """Discards the entry at ``length``, if any, of an instruction that stopped before completing.
+
+        Records of servicing before it stay, as that has happened; they belong to the next entry.
+        """
+        if len(self._pcs) <= length:
+            return
+        for entries in (
+                self._pcs, self._psrs, self._registers, self._register_values,
+                self._addresses, self._memory_values, self._input_positions, self._output_lengths):
+            del entries[length:]
+        del self._record_indices[self._traced_records:]
+        del self._records[self._traced_records * _RECORD_SIZE:]
+        del self._device_states[self._traced_records:]
+
+    def trace(self, simulator: Simulator, pc: int, instruction: int):
+        """Records what ``instruction``, about to execute at ``pc``, may overwrite"""
+        memory = simulator._memory
+        opcode = instruction >> 12
+        register = address = _NONE
+        supervisor = pushes = devices = False
+        if opcode in _WRITES_DESTINATION:
+            register = (instruction >> 9) & 0x7
+            if opcode in _LOADS:
+                if opcode == 0x6:
+                    offset = instruction & 0x3F
+                    source = (simulator._registers[(instruction >> 6) & 0x7] + offset - ((offset & 0x20) << 1)) & 0xFFFF
+                else:
+                    offset = instruction & 0x1FF
+                    source = (pc + 1 + offset - ((offset & 0x100) << 1)) & 0xFFFF
+                    if opcode == 0xA:
+                        devices = source >= MIN_DEVICE_ADDRESS
+                        source = memory[source]
+                devices = devices or (source >= MIN_DEVICE_ADDRESS and source not in _RECORDED_DEVICE_READS)
+        elif opcode == 0x4:
+            register = 7
+        elif opcode in _STORES:
+            if opcode == 0x7:
+                offset = instruction & 0x3F
+                address = (simulator._registers[(instruction >> 6) & 0x7] + offset - ((offset & 0x20) << 1)) & 0xFFFF
+            else:
+                offset = instruction & 0x1FF
+                address = (pc + 1 + offset - ((offset & 0x100) << 1)) & 0xFFFF
+                if opcode == 0xB:
+                    devices = address >= MIN_DEVICE_ADDRESS
+                    address = memory[address]
+            devices = devices or (address >= MIN_DEVICE_ADDRESS and address != DDR)
+        elif opcode == 0x8:
+            supervisor = True
+        elif opcode == 0xF:
+            vector = instruction & 0xFF
+            if memory[vector]:
+                supervisor = pushes = True
+            elif vector == _HALT_TRAP:
+                devices = True
+            elif vector in _NATIVE_INPUT_TRAPS:
+                register = 0
+
+        index = len(self._pcs)
+        if not index:
+            self._first_count = simulator._instruction_count
+        serviced = bool(self._record_indices) and self._record_indices[-1] == index
+        if not serviced and (not self._checkpoint_indices
+                             or index - self._checkpoint_indices[-1] >= self._checkpoint_interval):
+            # A checkpoint after servicing would miss what the service changed, so wait for the next entry.
+            self._checkpoint_indices.append(index)
+            self._checkpoints[index] = dataclasses.replace(
+                simulator._capture(), instruction_count=self._first_count + index)
+        self._traced_records = len(self._record_indices)
+        if supervisor or devices:
+            self._record(simulator, pushes, devices)
+        self._pcs.append(pc)
+        self._psrs.append(simulator._psr)
+        self._registers.append(register)
+        self._register_values.append(simulator._registers[register] if register != _NONE else 0)
+        self._addresses.append(address)
+        self._memory_values.append(memory[address] if address != _NONE else 0)
+        self._input_positions.append(simulator._keyboard._position)
+        self._output_lengths.append(len(simulator._display.output))
+
+    def _record(self, simulator: Simulator, pushes: bool, devices: bool):
+        """Adds a record to the next entry.
+
+        :param pushes: Whether the PSR and PC may be pushed onto the supervisor stack.
+        :param devices: Whether device state or pending events may change.
+        """
+        memory = simulator._memory
+        registers = simulator._registers
+        first = second = _NONE
+        if pushes:
+            stack = simulator._saved_ssp if simulator._psr & _USER_MODE else registers[6]
+            first, second = (stack - 1) & 0xFFFF, (stack - 2) & 0xFFFF
+        self._record_indices.append(len(self._pcs))
+        self._records.extend((
+            simulator._pc, simulator._psr, registers[6], simulator._saved_ssp, simulator._saved_usp,
+            first, memory[first] if first != _NONE else 0, second, memory[second] if second != _NONE else 0))
+        self._device_states.append(_save_devices(simulator) if devices else None)
+
+    def step_back(self, simulator: Simulator, count: int) -> int:
+        """Undoes the last ``count`` recorded instructions, returning how many were undone"""
+        count = min(count, len(self))
+        if count <= 0:
+            return 0
+        target = len(self) - count
+        nearest = bisect.bisect_left(self._checkpoint_indices, target)
+        if nearest < len(self._checkpoint_indices):
+            self._restore_checkpoint(simulator, self._checkpoint_indices[nearest])
+        self._undo_pending(simulator)
+        while len(self) > target:
+            self._undo_last(simulator)
+        return count
+
+    def run_back_to(self, simulator: Simulator, address: int) -> int:
+        """Undoes instructions until the PC reaches ``address`` or the log is empty"""
+        undone = 0
+        if len(self) > 0:
+            self._undo_pending(simulator)
+        while len(self) > 0:
+            self._undo_last(simulator)
+            undone += 1
+            if simulator._pc == address:
+                break
+        return undone
+
+    def _undo_pending(self, simulator: Simulator):
+        """Undoes servicing that no instruction has followed yet"""
+        while self._record_indices and self._record_indices[-1] == len(self):
+            self._undo_record(simulator)
+
+    def _undo_last(self, simulator: Simulator):
+        index = len(self) - 1
+        register = self._registers.pop()
+        register_value = self._register_values.pop()
+        if register != _NONE:
+            simulator._registers[register] = register_value
+        address = self._addresses.pop()
+        memory_value = self._memory_values.pop()
+        if address != _NONE:
+            simulator._memory[address] = memory_value
+            simulator._mark_dirty(address, address + 1)
+        simulator._pc = self._pcs.pop()
+        simulator._set_psr(self._psrs.pop())
+        simulator._keyboard._position = self._input_positions.pop()
+        del simulator._display.output[self._output_lengths.pop():]
+        simulator._instruction_count -= 1
+        # The instruction's own record comes after any from servicing events before it.
+        while self._record_indices and self._record_indices[-1] == index:
+            self._undo_record(simulator)
+        if self._checkpoint_indices and self._checkpoint_indices[-1] == index:
+            del self._checkpoints[self._checkpoint_indices.pop()]
+
+    def _undo_record(self, simulator: Simulator):
+        self._record_indices.pop()
+        start = len(self._records) - _RECORD_SIZE
+        pc, psr, r6, saved_ssp, saved_usp, first, first_value, second, second_value = self._records[start:]
+        del self._records[start:]
+        for address, value in ((first, first_value), (second, second_value)):
+            if address != _NONE:
+                simulator._memory[address] = value
+                simulator._mark_dirty(address, address + 1)
+        simulator._registers[6] = r6
+        simulator._saved_ssp = saved_ssp
+        simulator._saved_usp = saved_usp
+        simulator._pc = pc
+        simulator._set_psr(psr)
+        device_state = self._device_states.pop()
+        if device_state is not None:
+            _restore_devices(simulator, device_state)
+
+    def _restore_checkpoint(self, simulator: Simulator, index: int):
+        """Restores the state from before entry ``index`` and discards it and every later entry"""
+        pending_input = bytes(simulator._keyboard._input)
+        simulator._restore_state(self._checkpoints[index])
+        simulator._keyboard._input[:] = pending_input
+        self.truncate(index)
@@ -1,4 +1,13 @@
-
 MIN_ADDRESS = 0x0000
 MIN_USER_ADDRESS = 0x3000
-MAX_ADDRESS = 0xFFFF
\ No newline at end of file
+MAX_ADDRESS = 0xFFFF
+
+MIN_DEVICE_ADDRESS = 0xFE00
+KBSR = 0xFE00
+KBDR = 0xFE02
+DSR = 0xFE04
+DDR = 0xFE06
+MCR = 0xFFFE
+
+TRAP_VECTOR_TABLE = 0x0000
+INTERRUPT_VECTOR_TABLE = 0x0100
@@ -0,0 +1,28 @@
+from lc3_py.assembler.instructions import Add, AndIm, LabelBr, Label, Register
+from lc3_py.assembler.parser_old import parse_lc3
+from lc3_py.type_additions import ErrList, iserr
+
+
+def test_parse_statements():
+    matches = parse_lc3("ADD r1, r1, r2\nbrnp LOOP\nand r1 r2 #3\n")
+    assert not iserr(matches)
+    assert [match.lexeme for match in matches] == [
+        Add(Register.R1, Register.R1, Register.R2),
+        LabelBr(True, False, True, Label("LOOP")),
+        AndIm(Register.R1, Register.R2, 3), # type: ignore
+    ]
+
+
+def test_all_errors_are_collected():
+    source = "ADD r1, r1\nbrnp LOOP\nand r9 r2 r3\njmp r1 r2\nadd r1 r1 #16\nadd r1 r1 r1\n"
+    errors = parse_lc3(source)
+    assert isinstance(errors, ErrList)
+    assert [source[error.span.start:error.span.end] for error in errors] == [ # type: ignore
+        "ADD", "and r9 r2 r3", "jmp r1", "add r1 r1 #16"]
+    assert "5 bits" in errors[3].error
+
+
+def test_lexer_errors_are_collected():
+    errors = parse_lc3("add r1 r1 r1\n3abc\nadd r1 r1 r1\n4def\n")
+    assert isinstance(errors, ErrList)
+    assert [error.span.start for error in errors] == [13, 31] # type: ignore
@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from lc3_py.assembler import instructions as ins
+from lc3_py.assembler.assembler import Address, Label, SymbolTable
+from lc3_py.assembler.disassembler import Disassembly
+
+
+PROGRAM = [
+    0x2207, # LD R1, COUNT
+    0x5020, # AND R0, R0, #0
+    0x1021, # LOOP ADD R0, R0, #1
+    0x7100, # STR R0, R4, #0
+    0x127F, # ADD R1, R1, #-1
+    0x03FC, # BRp LOOP
+    0xC1C0, # RET
+    0xF025, # HALT
+    0x0003, # COUNT .FILL #3
+    0xD000, # .FILL xD000
+]
+
+
+def test_decode():
+    disassembly = Disassembly(PROGRAM, origin=0x3000)
+    assert disassembly.targets.tolist()[:6] == [0x3008, -1, -1, -1, -1, 0x3002]
+    assert disassembly.instruction(4) == ins.AddIm(ins.Register.R1, ins.Register.R1, -1) # type: ignore
+    assert disassembly.instruction(5) == ins.Br(False, False, True, -4) # type: ignore
+    assert disassembly.instruction(3) == ins.Str(ins.Register.R0, ins.Register.R4, 0) # type: ignore
+    assert disassembly.instruction(6) == ins.Ret()
+    assert disassembly.instruction(9) is None
+
+
+def test_listing():
+    symbols = SymbolTable()
+    symbols.add(Label("LOOP"), Address(0x3002))
+    symbols.add(Label("COUNT"), Address(0x3008))
+    lines = Disassembly(PROGRAM, origin=0x3000).listing(symbols)
+    assert [line.split(None, 2)[2] for line in lines] == [
+        "LD R1, COUNT",
+        "AND R0, R0, #0",
+        "LOOP        ADD R0, R0, #1",
+        "STR R0, R4, #0",
+        "ADD R1, R1, #-1",
+        "BRp LOOP",
+        "RET",
+        "HALT",
+        "COUNT       NOP",
+        ".FILL xD000",
+    ]
+
+
+def test_listing_other_opcodes():
+    lines = Disassembly([0x4080, 0x9A3F, 0xC080, 0xF0FF, 0x6E7F, 0x8000]).listing()
+    assert [line.split(None, 2)[2] for line in lines] == [
+        "JSRR R2", "NOT R5, R0", "JMP R2", "TRAP xFF", "LDR R7, R1, #-1", "RTI"]
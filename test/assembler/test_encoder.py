@@ -0,0 +1,61 @@
+import json
+
+from lc3_py.assembler.encoder import assemble_lc3
+from lc3_py.assembler.stats import StatsCollector
+from lc3_py.type_additions import ErrList, iserr
+
+
+SOURCE = """
+brz bravo
+add r1 r1 #1
+bravo and r0 r0 r0
+brnzp bravo
+jmp r7
+"""
+
+
+def test_assemble():
+    program = assemble_lc3(SOURCE)
+    assert not iserr(program)
+    assert [segment.words.tolist() for segment in program.image.segments] == [
+        [0x0401, 0x1261, 0x5000, 0x0FFE, 0xC1C0]]
+    label = program.symbols.label_at(0x3002)
+    assert label is not None and label.value == "bravo"
+    assert dict(program.lines) == {0x3000: 2, 0x3001: 3, 0x3002: 4, 0x3003: 5, 0x3004: 6}
+    from_buffer = assemble_lc3(memoryview(SOURCE.encode()))
+    assert not iserr(from_buffer)
+    assert from_buffer.image.segments[0].words == program.image.segments[0].words
+
+
+def test_immediates():
+    program = assemble_lc3("add r1 r1 #10\nadd r1 r1 #-1\nadd r1 r1 xA\nadd r1 r1 x-3\nand r2 r2 #-16\nadd r1 r1 #9\n")
+    assert not iserr(program)
+    assert program.image.segments[0].words.tolist() == [0x126A, 0x127F, 0x126A, 0x127D, 0x54B0, 0x1269]
+    errors = assemble_lc3("add r1 r1 #16\n")
+    assert isinstance(errors, ErrList) and "5 bits" in errors[0].error
+
+
+def test_origin():
+    program = assemble_lc3("add r1 r1 #1\n", origin=0)
+    assert not iserr(program) and program.image.segments[0].origin == 0
+    errors = assemble_lc3("add r1 r1 #1\n", origin=0x10000)
+    assert isinstance(errors, ErrList) and "invalid origin" in errors[0].error
+
+
+def test_undefined_label():
+    errors = assemble_lc3("brz nowhere\n")
+    assert isinstance(errors, ErrList) and "nowhere" in errors[0].error
+
+
+def test_stats():
+    stats = StatsCollector()
+    assert not iserr(assemble_lc3(SOURCE, stats=stats))
+    phases = stats.as_dict()
+    assert list(phases) == ["lex", "parse", "symbols", "encode"]
+    assert phases["lex"]["items"] == 21
+    assert phases["parse"]["items"] == 6
+    assert phases["parse"]["calls"] > phases["parse"]["backtracks"] > 0
+    assert phases["symbols"]["items"] == 1
+    assert phases["encode"]["items"] == 5
+    assert all(phase["seconds"] > 0 and phase["peak_bytes"] > 0 for phase in phases.values())
+    assert json.loads(stats.to_json()) == phases
@@ -0,0 +1,55 @@
+import io
+
+from lc3_py.assembler.image import Image, Segment
+from lc3_py.assembler.object_file import write_image
+from lc3_py.simulator.simulator import Simulator
+from lc3_py.type_additions import iserr
+
+
+def test_blkw_is_reserved():
+    image = Image()
+    image.orig(0x3000)
+    image.extend([0xE002, 0xF025])
+    image.reserve(0x8000)
+    image.fill(0x1234)
+    image.orig(0x4000)
+    image.reserve(4)
+
+    assert [(s.origin, s.words.tolist(), s.reserved) for s in image.segments] == [
+        (0x3000, [0xE002, 0xF025], 0x8000),
+        (0xB002, [0x1234], 0),
+        (0x4000, [], 4),
+    ]
+    assert [len(block) for block in image.blocks()] == [2, 1]
+
+
+def test_errors():
+    image = Image()
+    assert iserr(image.fill(0))
+    image.orig(0xFFFE)
+    assert not iserr(image.reserve(2))
+    assert iserr(image.fill(0))
+    assert iserr(image.orig(0x10000))
+
+
+def test_write_image():
+    image = Image()
+    image.orig(0x3000)
+    image.fill(0xF025)
+    image.reserve(2)
+    image.fill(0x0041)
+    file = io.BytesIO()
+    write_image(file, image)
+    assert file.getvalue() == bytes.fromhex("3000 F025 0000 0000 0041")
+
+
+def test_load_image():
+    simulator = Simulator()
+    simulator.load(0x3001, [0xFFFF, 0xFFFF])
+    image = Image()
+    image.segments.append(Segment(0x3000, reserved=2))
+    image.orig(0x5000)
+    image.fill(7)
+    simulator.load_image(image)
+    assert simulator.memory_view(0x3000, 0x3003).tolist() == [0, 0, 0xFFFF]
+    assert simulator.read(0x5000) == 7
@@ -1,5 +1,7 @@
+import pickle
 import typing as t
 from lc3_py.type_additions import iserr
+from lc3_py.assembler import instructions, lexer
 from lc3_py.assembler.lexer import *
 
 def test_hello_world():
@@ -78,4 +80,57 @@ label-here .STRINGZ,    "Hello, World!"
             assert lexed_token.span.start == source.find("123abc") and  lexed_token.span.end == source.find("123abc") + len("123abc")
         else:
             assert lexed_token.lexeme == lexeme
-    assert len(matches.matches) == len(should_be)
\ No newline at end of file
+    assert len(matches.matches) == len(should_be)
+
+def test_words_are_interned():
+    matches = lex_lc3("loop ADD r1 LOOP\n")
+    assert not iserr(matches)
+    loop, _, _, upper_loop = (match.lexeme for match in matches[:4])
+    assert isinstance(loop, Word) and isinstance(upper_loop, Word)
+    assert loop == upper_loop and hash(loop) == hash(upper_loop)
+    assert loop.key is upper_loop.key
+    again = lex_lc3("loop\n")
+    assert not iserr(again) and again[0].lexeme is loop
+
+
+def test_labels_pickle():
+    label = instructions.Label("Loop")
+    loaded = pickle.loads(pickle.dumps(label))
+    assert loaded == instructions.Label("LOOP") and hash(loaded) == hash(label)
+    assert loaded.key is label.key
+
+
+def test_word_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(lexer, "_words", {})
+    monkeypatch.setattr(lexer, "_MAX_WORDS", 4)
+    assert not iserr(lex_lc3("alpha bravo charlie delta echo foxtrot golf\n"))
+    assert len(lexer._words) <= 4
+    golf = lex_lc3("Golf\n")
+    assert not iserr(golf) and golf[0].lexeme == Word("golf")
+
+
+def test_lex_bytes():
+    import mmap
+    import tempfile
+    source = "; héllo\nLOOP add r1, r1, #1\n\t'c' \"str\" .fill x10 brz loop\r\n"
+    expected = lex_lc3(source)
+    assert not iserr(expected)
+    with tempfile.TemporaryFile() as file:
+        file.write(source.encode())
+        file.flush()
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            matches = lex_lc3_bytes(buffer)
+    assert not iserr(matches)
+    assert [match.lexeme for match in matches] == [match.lexeme for match in expected]
+    assert matches[2].span.start == len("; héllo\n".encode()) == expected[2].span.start + 1
+    assert matches[2].lexeme is expected[2].lexeme
+
+    invalid = lex_lc3_bytes(b"add \xff\xfe r1")
+    assert iserr(invalid) and invalid.errors[0].error == "invalid UTF-8"
+
+
+def test_integers():
+    matches = lex_lc3("#10 #-1 x1F X-3 xabel #2x")
+    assert not iserr(matches)
+    assert [match.lexeme for match in matches] == [
+        Integer(10, "#10"), Integer(-1, "#-1"), Integer(31, "x1F"), Integer(-3, "X-3"), Word("xabel"), Word("#2x")]
@@ -0,0 +1,34 @@
+import io
+
+from lc3_py.assembler.line_table import LineTable
+
+
+def test_line_table():
+    table = LineTable()
+    table.add(0x3000, 2, "main.asm")
+    table.add(0x3001, 3, "main.asm")
+    table.add(0x3002, 4, "main.asm", count=14)
+    table.add(0x3010, 4, "main.asm", count=2)
+    table.add(0x4000, 1, "data.asm", count=0x100)
+    table.add(0x2000, 7, "os.asm")
+
+    assert table.row_count == 5
+    assert table.source(0x3011) == ("main.asm", 4)
+    assert table.source(0x2000) == ("os.asm", 7)
+    assert table.get(0x3012) is None
+    assert table[0x40FF] == 1
+    assert len(table) == 0x113
+    assert list(table)[:3] == [0x2000, 0x3000, 0x3001]
+
+
+def test_write_and_read():
+    table = LineTable()
+    table.add(0x3000, 2, "main.asm", count=3)
+    table.add(0x3003, 5, "lib.asm")
+    file = io.BytesIO()
+    table.write(file)
+    file.seek(0)
+    loaded = LineTable.read(file)
+    assert loaded.files == ["main.asm", "lib.asm"]
+    assert dict(loaded.items()) == dict(table.items())
+    assert loaded.source(0x3003) == ("lib.asm", 5)
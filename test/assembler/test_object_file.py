@@ -0,0 +1,9 @@
+import io
+
+from lc3_py.assembler.object_file import write_object
+
+
+def test_write_object():
+    file = io.BytesIO()
+    write_object(file, 0x3000, [0xE002, 0xF022, 0x0048])
+    assert file.getvalue() == bytes.fromhex("3000 E002 F022 0048")
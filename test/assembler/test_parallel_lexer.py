@@ -0,0 +1,42 @@
+import random
+
+from lc3_py.assembler.lexer import Word, lex_lc3
+from lc3_py.assembler.parallel_lexer import chunk_starts, lex_lc3_parallel
+from lc3_py.type_additions import iserr
+
+_LINES = [
+    "LOOP add r1, r1, #1", "\tbrnzp LOOP ; back\r", "", "   ", ".STRINGZ \"a\rb\"",
+    "  'c' .fill x10", "; only a comment", "jmp r7\r\n\r", "label-here\t"]
+
+
+def _source(lines: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return "\n".join(rng.choice(_LINES) for _ in range(lines)) + rng.choice(["", "\n", "\n  "])
+
+
+def test_chunk_starts():
+    source = _source(200, 0)
+    starts = chunk_starts(source, 64)
+    assert starts[0] == 0 and len(starts) > 10
+    for previous, start in zip(starts, starts[1:]):
+        assert start - previous >= 64
+        assert source[start - 1] == "\n" and not source[start].isspace()
+
+
+def test_matches_serial():
+    for seed in range(3):
+        source = _source(300, seed)
+        serial = lex_lc3(source)
+        parallel = lex_lc3_parallel(source, processes=2, chunk_size=50)
+        assert not iserr(serial) and not iserr(parallel)
+        assert parallel == serial
+        assert all(p.lexeme is s.lexeme for p, s in zip(parallel, serial) if isinstance(s.lexeme, Word))
+    assert lex_lc3_parallel("add r1 r1 r1", processes=2) == lex_lc3("add r1 r1 r1")
+
+
+def test_stops_at_first_error():
+    source = _source(100, 3) + "\nadd r1 r1 5x\n" + _source(100, 4) + "\n9bad\n"
+    serial = lex_lc3(source)
+    parallel = lex_lc3_parallel(source, processes=2, chunk_size=40)
+    assert iserr(serial) and iserr(parallel)
+    assert parallel.matches == serial.matches
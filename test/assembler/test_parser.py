@@ -1,6 +1,12 @@
 from lc3_py.assembler.parser import *
 from lc3_py.assembler.instructions import Add, LabelBr, Register, Label
 from lc3_py.type_additions import iserr
+from lc3_py.assembler import parser_old
+from lc3_py.parsing import Combinator
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import pickle
+import time
 
 
 def test_add():
@@ -9,6 +15,17 @@ def test_add():
     print(res)
 
 
+def test_grammar_pickles_for_workers():
+    data = pickle.dumps(add)
+    start = time.perf_counter()
+    loaded = pickle.loads(data)
+    assert time.perf_counter() - start < 0.05
+    assert loaded.parse("add r1 r2 #3") == add.parse("add r1 r2 #3")
+    assert pickle.loads(pickle.dumps(parser_old.parsing_functions)) == parser_old.parsing_functions
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        assert executor.submit(Combinator.parse, add, "add r1 r2 #3").result() == add.parse("add r1 r2 #3")
+
+
 # def test_add():
 #     matches = parse_lc3("""add r1, r1, r1""")
 #     assert not iserr(matches)
@@ -0,0 +1,30 @@
+import pickle
+
+from lc3_py.assembler.assembler import Address, Label, SymbolTable
+from lc3_py.type_additions import iserr
+
+
+def test_reverse_lookup():
+    symbols = SymbolTable()
+    symbols.add(Label("END"), Address(0x3010))
+    symbols.add(Label("MAIN"), Address(0x3000))
+    symbols.add(Label("LOOP"), Address(0x3004))
+    symbols.add(Label("AGAIN"), Address(0x3004))
+    assert iserr(symbols.add(Label("MAIN"), Address(0x3008)))
+
+    assert symbols.label_at(0x3004) == Label("LOOP")
+    assert symbols.label_at(0x3005) is None
+    assert symbols.nearest_label(0x2FFF) is None
+    assert symbols.nearest_label(0x3000) == (Label("MAIN"), 0)
+    assert symbols.nearest_label(0x3004) == (Label("LOOP"), 0)
+    assert symbols.nearest_label(0x3007) == (Label("LOOP"), 3)
+    assert symbols.nearest_label(0xFFFF) == (Label("END"), 0xCFEF)
+
+
+def test_labels_pickle():
+    symbols = SymbolTable()
+    symbols.add(Label("Loop"), Address(0x3004))
+    loaded = pickle.loads(pickle.dumps(Label("LOOP")))
+    assert loaded == Label("loop") and loaded.value == "LOOP"
+    address = symbols.get_value(loaded)
+    assert not iserr(address) and address.value == 0x3004
@@ -0,0 +1,28 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from lc3_py.assembler.vectorized import (
+    encode_add, encode_add_immediate, encode_br, encode_fill, encode_jsr, encode_ldr, encode_not, encode_trap)
+
+
+def test_encode():
+    assert encode_add_immediate([0, 1, 1], [0, 1, 1], [1, 5, -1]).tolist() == [0x1021, 0x1265, 0x127F]
+    assert encode_add(2, 3, [4, 5]).tolist() == [0x14C4, 0x14C5]
+    assert encode_br([0, 1], [0, 1], [1, 1], [-4, 0]).tolist() == [0x03FC, 0x0E00]
+    assert encode_ldr(1, 2, -1).tolist() == 0x62BF
+    assert encode_not(1, 2).tolist() == 0x92BF
+    assert encode_jsr(-1).tolist() == 0x4FFF
+    assert encode_trap([0x20, 0x25]).tolist() == [0xF020, 0xF025]
+    assert encode_fill([-1, 0xFFFF, 65]).tolist() == [0xFFFF, 0xFFFF, 65]
+
+
+def test_range_checks():
+    with pytest.raises(ValueError, match="immediate 16 at index 2"):
+        encode_add_immediate(0, 0, [15, -16, 16])
+    with pytest.raises(ValueError, match="destination 8"):
+        encode_add(np.arange(9), 0, 0)
+    with pytest.raises(ValueError):
+        encode_br(1, 1, 1, 256)
+    with pytest.raises(ValueError):
+        encode_fill([0x10000])
@@ -0,0 +1,88 @@
+from lc3_py.assembler.encoder import assemble_lc3
+from lc3_py.simulator.coverage import Coverage
+from lc3_py.simulator.simulator import Simulator
+from lc3_py.type_additions import iserr
+
+
+PROGRAM = [
+    0xF020, # GETC
+    0x1030, # ADD R0, R0, #-16
+    0x0402, # BRz ZERO
+    0x1261, # ADD R1, R1, #1
+    0xF025, # HALT
+    0x1262, # ZERO ADD R1, R1, #2
+    0xF025, # HALT
+]
+LINES = {0x3000 + index: index + 1 for index in range(len(PROGRAM))}
+
+
+def cover(data: bytes) -> Coverage:
+    simulator = Simulator()
+    simulator.load(0x3000, PROGRAM)
+    coverage = Coverage()
+    simulator.enable_coverage(coverage)
+    simulator.feed(data)
+    simulator.run()
+    return coverage
+
+
+def test_coverage():
+    coverage = cover(b"\x10")
+    assert coverage.covered(0x3005) and not coverage.covered(0x3003)
+    assert coverage.branch_outcomes(0x3002) == (True, False)
+    assert coverage.covered_count == 5
+    assert coverage.uncovered_lines(LINES) == [4, 5]
+
+
+def test_merge():
+    coverage = cover(b"\x10")
+    coverage |= cover(b"A")
+    assert coverage.covered_count == len(PROGRAM)
+    assert coverage.branch_outcomes(0x3002) == (True, True)
+    assert coverage.branch_outcome_count == 2
+    assert coverage.uncovered_lines(LINES) == []
+
+
+def test_coverage_accumulates_across_restores():
+    simulator = Simulator()
+    simulator.load(0x3000, PROGRAM)
+    snapshot = simulator.snapshot()
+    coverage = Coverage()
+    simulator.enable_coverage(coverage)
+    for data in (b"\x10", b"A"):
+        simulator.restore(snapshot)
+        simulator.feed(data)
+        simulator.run()
+    assert coverage.uncovered_lines(LINES) == []
+
+
+def test_coverage_alongside_tracers():
+    simulator = Simulator()
+    simulator.load(0x3000, PROGRAM)
+    coverage = Coverage()
+    simulator.enable_coverage(coverage)
+    simulator.enable_undo()
+    simulator.feed(b"A")
+    simulator.run()
+    assert coverage.uncovered_lines(LINES) == [6, 7]
+    assert coverage.branch_outcomes(0x3002) == (False, True)
+
+
+def test_uncovered_source_lines():
+    program = assemble_lc3("""
+and r1 r1 #0
+brz bravo
+add r1 r1 #1
+
+add r1 r1 #2
+bravo
+brnzp bravo
+""")
+    assert not iserr(program)
+    simulator = Simulator()
+    simulator.load_image(program.image)
+    coverage = Coverage()
+    simulator.enable_coverage(coverage)
+    simulator.run(budget=100)
+    assert coverage.uncovered_lines(program.lines) == [4, 6]
+    assert coverage.branch_outcomes(0x3001) == (True, False)
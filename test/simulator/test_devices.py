@@ -0,0 +1,127 @@
+import pytest
+
+from lc3_py.simulator.devices import Device
+from lc3_py.simulator.simulator import Simulator, ExitReason
+
+
+KEYBOARD_SERVICE_ROUTINE = [
+    0xA003, # LDI R0, KBDR_ADDRESS
+    0x3003, # ST R0, LAST
+    0x1261, # ADD R1, R1, #1
+    0x8000, # RTI
+    0xFE02, # KBDR_ADDRESS .FILL xFE02
+    0x0000, # LAST .BLKW 1
+]
+
+TIMER_SERVICE_ROUTINE = [
+    0xA002, # LDI R0, TMR_ADDRESS
+    0x1261, # ADD R1, R1, #1
+    0x8000, # RTI
+    0xFE08, # TMR_ADDRESS .FILL xFE08
+]
+
+
+def test_keyboard_interrupts():
+    simulator = Simulator()
+    simulator.load(0x0180, [0x1000])
+    simulator.load(0x1000, KEYBOARD_SERVICE_ROUTINE)
+    simulator.load(0x3000, [
+        0x2404, # LD R2, ENABLE
+        0xB404, # STI R2, KBSR_ADDRESS
+        0x187E, # WAIT ADD R4, R1, #-2
+        0x0BFE, # BRnp WAIT
+        0xF025, # HALT
+        0x4000, # ENABLE .FILL x4000
+        0xFE00, # KBSR_ADDRESS .FILL xFE00
+    ])
+    simulator.feed(b"xy")
+    assert simulator.run(budget=1000).exit_reason == ExitReason.HALT
+    assert simulator.get_register(1) == 2
+    assert simulator.read(0x1005) == ord("y")
+    assert simulator.psr & 0x8000 and simulator.get_register(6) == 0
+
+
+TIMER_PROGRAM = [
+    0x2407, # LD R2, ENABLE
+    0xB407, # STI R2, TMR_ADDRESS
+    0x2407, # LD R2, INTERVAL
+    0xB407, # STI R2, TMI_ADDRESS
+    0x187B, # WAIT ADD R4, R1, #-5
+    0x09FE, # BRn WAIT
+    0xF025, # HALT
+    0x0000,
+    0x4000, # ENABLE .FILL x4000
+    0xFE08, # TMR_ADDRESS .FILL xFE08
+    100,    # INTERVAL .FILL #100
+    0xFE0A, # TMI_ADDRESS .FILL xFE0A
+]
+
+
+def load_timer_program() -> Simulator:
+    simulator = Simulator()
+    simulator.load(0x0181, [0x1000])
+    simulator.load(0x1000, TIMER_SERVICE_ROUTINE)
+    simulator.load(0x3000, TIMER_PROGRAM)
+    return simulator
+
+
+def test_timer_interrupts():
+    simulator = load_timer_program()
+    snapshot = simulator.snapshot()
+    result = simulator.run()
+    assert result.exit_reason == ExitReason.HALT
+    assert simulator.get_register(1) == 5
+    assert 4 + 5 * 100 <= result.instruction_count < 4 + 6 * 100
+
+    simulator.restore(snapshot)
+    while not simulator.halted:
+        simulator.step()
+    assert simulator.instruction_count == result.instruction_count
+    assert simulator.get_register(1) == 5
+
+
+def test_undo_through_interrupts():
+    simulator = load_timer_program()
+    simulator.enable_undo(checkpoint_interval=50)
+    initial = simulator.registers
+    assert simulator.run(budget=250).exit_reason == ExitReason.BUDGET_EXHAUSTED
+    assert simulator.get_register(1) == 2
+    assert simulator.step_back(100) == 100
+    assert simulator.get_register(1) == 1
+    assert simulator.step_back(150) == 150
+    assert simulator.registers == initial and simulator.instruction_count == 0
+    assert simulator.run().exit_reason == ExitReason.HALT
+    assert simulator.get_register(1) == 5
+
+
+class Counter(Device):
+    addresses = (0xFE10,)
+
+    def __init__(self):
+        self.value = 0
+    def read(self, simulator: Simulator, address: int) -> int:
+        self.value += 1
+        return self.value
+    def write(self, simulator: Simulator, address: int, value: int):
+        self.value = value
+    def save(self):
+        return self.value
+    def restore(self, state: int):
+        self.value = state
+
+
+def test_attach_device():
+    simulator = Simulator()
+    counter = Counter()
+    simulator.attach(counter)
+    simulator.load(0x3000, [
+        0xA003, # LDI R0, COUNTER_ADDRESS
+        0xA002, # LDI R0, COUNTER_ADDRESS
+        0xF025, # HALT
+        0x0000,
+        0xFE10, # COUNTER_ADDRESS .FILL xFE10
+    ])
+    simulator.run()
+    assert simulator.get_register(0) == 2 and counter.value == 2
+    with pytest.raises(ValueError):
+        simulator.attach(Counter())
@@ -0,0 +1,35 @@
+import random
+
+from lc3_py.simulator.fuzzer import fuzz, mutate
+from lc3_py.simulator.simulator import Simulator, ExitReason
+
+
+PROGRAM = [
+    0xF020, # GETC
+    0x2204, # LD R1, NEG_X
+    0x1201, # ADD R1, R0, R1
+    0x0401, # BRz CRASH
+    0xF025, # HALT
+    0xD000, # CRASH .FILL xD000
+    0xFFA8, # NEG_X .FILL #-88
+]
+
+
+def test_fuzz_finds_crash():
+    simulator = Simulator()
+    simulator.load(0x3000, PROGRAM)
+    result = fuzz(simulator, [b"A"], executions=4000, processes=2, seed=1)
+
+    assert result.executions == 4000
+    assert [(crash.exit_reason, crash.pc) for crash in result.crashes] == [(ExitReason.INVALID_OPCODE, 0x3005)]
+    assert result.crashes[0].data[:1] == b"X"
+    assert result.coverage.covered(0x3005) and result.coverage.covered(0x3004)
+    assert result.coverage.branch_outcomes(0x3003) == (True, True)
+    assert simulator.instruction_count == 0
+
+
+def test_mutate_is_deterministic():
+    corpus = [b"hello", b"world"]
+    first = [mutate(b"hello", corpus, random.Random(3)) for _ in range(10)]
+    second = [mutate(b"hello", corpus, random.Random(3)) for _ in range(10)]
+    assert first == second
@@ -0,0 +1,60 @@
+from lc3_py.assembler.assembler import Address, Label, SymbolTable
+from lc3_py.simulator.profiler import Profiler, format_report
+from lc3_py.simulator.simulator import Simulator, ExitReason, PAGE_BITS
+
+
+PROGRAM = [
+    0x2207, # LD R1, COUNT
+    0x5020, # AND R0, R0, #0
+    0x1021, # LOOP ADD R0, R0, #1
+    0x7100, # STR R0, R4, #0
+    0x127F, # ADD R1, R1, #-1
+    0x03FC, # BRp LOOP
+    0x3002, # ST R0, RESULT
+    0xF025, # HALT
+    0x0003, # COUNT .FILL #3
+    0x0000, # RESULT .BLKW 1
+]
+
+
+def test_profile():
+    simulator = Simulator()
+    simulator.load(0x3000, PROGRAM)
+    profiler = Profiler()
+    simulator.set_register(4, 0x4000)
+    simulator.add_tracer(profiler)
+    assert simulator.run().exit_reason == ExitReason.HALT
+    assert simulator.read(0x3009) == 3
+
+    assert profiler.executions[0x3000] == 1
+    assert profiler.executions[0x3002] == 3
+    assert profiler.branches_taken[0x3005] == 2
+    assert profiler.branches_not_taken[0x3005] == 1
+    assert profiler.opcode_counts == {"LD": 1, "ST": 1, "ADD": 6, "AND": 1, "STR": 3, "BR": 3, "TRAP": 1}
+    assert profiler.page_reads[0x3008 >> PAGE_BITS] == 1
+    assert profiler.page_writes[0x3009 >> PAGE_BITS] == 1
+    assert profiler.page_writes[0x4000 >> PAGE_BITS] == 3
+    assert sum(profiler.executions) == simulator.instruction_count
+
+    symbols = SymbolTable()
+    symbols.add(Label("MAIN"), Address(0x3000))
+    symbols.add(Label("LOOP"), Address(0x3002))
+    spots = profiler.report(symbols, {0x3000 + index: index + 1 for index in range(len(PROGRAM))}, limit=4)
+    assert [(spot.address, spot.count, spot.label, spot.offset, spot.line) for spot in spots] == [
+        (0x3002, 3, "LOOP", 0, 3),
+        (0x3003, 3, "LOOP", 1, 4),
+        (0x3004, 3, "LOOP", 2, 5),
+        (0x3005, 3, "LOOP", 3, 6),
+    ]
+    assert "taken 2, not taken 1" in format_report(spots)
+
+
+def test_profiler_can_be_removed():
+    simulator = Simulator()
+    simulator.load(0x3000, PROGRAM)
+    profiler = Profiler()
+    simulator.add_tracer(profiler)
+    simulator.step()
+    simulator.remove_tracer(profiler)
+    simulator.run()
+    assert sum(profiler.executions) == 1
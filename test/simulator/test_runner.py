@@ -0,0 +1,27 @@
+from lc3_py.simulator.runner import run_batch
+from lc3_py.simulator.simulator import Simulator, ExitReason
+
+
+def test_run_batch():
+    simulator = Simulator()
+    simulator.load(0x3000, [
+        0xF020, # GETC
+        0x1021, # ADD R0, R0, #1
+        0xF021, # OUT
+        0xF025, # HALT
+    ])
+    inputs = [bytes([c]) for c in b"abcdefgh"] + [b""]
+    results = sorted(run_batch(simulator, inputs, processes=2), key=lambda r: r.index)
+
+    assert [r.output for r in results[:-1]] == [bytes([c + 1]) for c in b"abcdefgh"]
+    assert all(r.exit_reason == ExitReason.HALT and r.instruction_count == 4 for r in results[:-1])
+    assert results[-1].exit_reason == ExitReason.WAITING_FOR_INPUT
+    assert results[0].registers.values[0] == ord("b")
+    assert simulator.instruction_count == 0
+
+
+def test_run_batch_budget():
+    simulator = Simulator()
+    simulator.load(0x3000, [0x0FFF]) # BRnzp #-1
+    results = list(run_batch(simulator, [b"", b""], budget=5000, processes=2))
+    assert [(r.exit_reason, r.instruction_count) for r in results] == [(ExitReason.BUDGET_EXHAUSTED, 5000)] * 2
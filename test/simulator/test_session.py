@@ -0,0 +1,66 @@
+import asyncio
+
+from lc3_py.simulator.session import run_session
+from lc3_py.simulator.simulator import Simulator, ExitReason
+
+
+POLLING_ECHO = [
+    0xA006, # LOOP LDI R0, KBSR_ADDRESS
+    0x07FE, # BRzp LOOP
+    0xA005, # LDI R0, KBDR_ADDRESS
+    0xF021, # OUT
+    0x1236, # ADD R1, R0, #-10
+    0x0BFA, # BRnp LOOP
+    0xF025, # HALT
+    0xFE00, # KBSR_ADDRESS .FILL xFE00
+    0xFE02, # KBDR_ADDRESS .FILL xFE02
+]
+
+
+class Writer:
+    def __init__(self):
+        self.data = bytearray()
+    def write(self, data: bytes):
+        self.data += data
+    async def drain(self):
+        pass
+
+
+def test_many_sessions():
+    async def session(line: bytes):
+        simulator = Simulator()
+        simulator.load(0x3000, POLLING_ECHO)
+        reader = asyncio.StreamReader()
+        writer = Writer()
+        task = asyncio.create_task(run_session(simulator, reader, writer))
+        for character in line:
+            await asyncio.sleep(0.001)
+            reader.feed_data(bytes([character]))
+        result = await task
+        return result, bytes(writer.data)
+
+    async def main():
+        lines = [f"session {i}\n".encode() for i in range(200)]
+        results = await asyncio.gather(*map(session, lines))
+        for line, (result, output) in zip(lines, results):
+            assert result.exit_reason == ExitReason.HALT
+            assert output == line
+    asyncio.run(main())
+
+
+def test_end_of_input_and_timeout():
+    async def main():
+        simulator = Simulator()
+        simulator.load(0x3000, [0xF020, 0xF021, 0x0FFD]) # GETC, OUT, BRnzp back
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"ab")
+        reader.feed_eof()
+        writer = Writer()
+        result = await run_session(simulator, reader, writer)
+        assert result.exit_reason == ExitReason.WAITING_FOR_INPUT
+        assert writer.data == b"ab"
+        assert not simulator.wait_for_keyboard
+
+        result = await run_session(simulator, asyncio.StreamReader(), writer, timeout=0.01)
+        assert result.exit_reason == ExitReason.TIMEOUT
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+import pytest
+
+from lc3_py.assembler.object_file import write_object
+from lc3_py.simulator.simulator import Simulator, ExitReason, RunResult
+
+
+HELLO = [
+    0xE002, # LEA R0, MESSAGE
+    0xF022, # PUTS
+    0xF025, # HALT
+    ord("H"), ord("i"), 0,
+]
+
+ECHO_NEXT = [
+    0xF020, # GETC
+    0x1021, # ADD R0, R0, #1
+    0xF021, # OUT
+    0xF025, # HALT
+]
+
+
+def load(program: list[int]) -> Simulator:
+    simulator = Simulator()
+    simulator.load(0x3000, program)
+    simulator.pc = 0x3000
+    return simulator
+
+
+def test_hello_world():
+    simulator = load(HELLO)
+    assert simulator.run().exit_reason == ExitReason.HALT
+    assert simulator.output == b"Hi"
+    assert simulator.instruction_count == 3
+    assert simulator.halted
+
+
+def test_input():
+    simulator = load(ECHO_NEXT)
+    assert simulator.run().exit_reason == ExitReason.WAITING_FOR_INPUT
+    assert simulator.pc == 0x3000
+    simulator.feed(b"a")
+    assert simulator.run().exit_reason == ExitReason.HALT
+    assert simulator.output == b"b"
+    assert simulator.get_register(0) == ord("b")
+
+
+def test_condition_codes_and_branches():
+    simulator = load([
+        0x5260, # AND R1, R1, #0
+        0x1265, # ADD R1, R1, #5
+        0x127F, # ADD R1, R1, #-1
+        0x03FE, # BRp #-2
+        0xF025, # HALT
+    ])
+    assert simulator.run().exit_reason == ExitReason.HALT
+    assert simulator.get_register(1) == 0
+    assert simulator.psr & 0x7 == 0b010
+    assert simulator.instruction_count == 2 + 5 * 2 + 1
+
+
+def test_faults():
+    assert load([0xD000]).run().exit_reason == ExitReason.INVALID_OPCODE
+    assert load([0x8000]).run().exit_reason == ExitReason.PRIVILEGE_VIOLATION
+    simulator = load([0x6040]) # LDR R0, R1, #0
+    assert simulator.run().exit_reason == ExitReason.ACCESS_VIOLATION
+    assert simulator.pc == 0x3000 and simulator.instruction_count == 0
+
+
+def test_budget():
+    simulator = load([0x0FFF]) # BRnzp #-1
+    assert simulator.run(budget=10_000) == RunResult(ExitReason.BUDGET_EXHAUSTED, 10_000)
+    assert simulator.instruction_count == 10_000
+
+
+def test_budget_is_exact_when_halting():
+    simulator = load(HELLO)
+    assert simulator.run(budget=2) == RunResult(ExitReason.BUDGET_EXHAUSTED, 2)
+    assert simulator.run(budget=2) == RunResult(ExitReason.HALT, 1)
+    assert simulator.run() == RunResult(ExitReason.HALT, 0)
+
+
+def test_timeout():
+    simulator = load([0x0FFF]) # BRnzp #-1
+    result = simulator.run(timeout=0.01)
+    assert result.exit_reason == ExitReason.TIMEOUT
+    assert result.instruction_count == simulator.instruction_count > 0
+
+
+def test_os_trap_and_rti():
+    simulator = load([0xF026, 0xF025]) # TRAP x26, HALT
+    simulator.load(0x0026, [0x0400])
+    simulator.load(0x0400, [
+        0x5020, # AND R0, R0, #0
+        0x1027, # ADD R0, R0, #7
+        0x8000, # RTI
+    ])
+    assert simulator.run().exit_reason == ExitReason.HALT
+    assert simulator.get_register(0) == 7
+    assert simulator.get_register(6) == 0
+    assert simulator.psr & 0x8000
+
+
+def test_snapshot_and_restore():
+    simulator = load([
+        0xF020, # GETC
+        0x3002, # ST R0, #2
+        0xF021, # OUT
+        0xF025, # HALT
+        0x0000,
+    ])
+    simulator.feed(b"q")
+    snapshot = simulator.snapshot()
+    assert simulator.run().exit_reason == ExitReason.HALT
+    assert simulator.read(0x3004) == ord("q")
+
+    simulator.restore(snapshot)
+    assert simulator.read(0x3004) == 0
+    assert simulator.output == b"" and simulator.pc == 0x3000 and not simulator.halted
+    assert simulator.run().exit_reason == ExitReason.HALT
+    assert simulator.output == b"q"
+
+    other = load([0xF025])
+    other.restore(snapshot)
+    assert other.snapshot().memory == snapshot.memory
+    assert other.run().instruction_count == 4
+
+
+def test_memory_view():
+    simulator = load(HELLO)
+    view = simulator.memory_view(0x3003, 0x3006)
+    assert view.readonly and view.format == "H"
+    assert view.tolist() == [ord("H"), ord("i"), 0]
+    simulator.load(0x3005, [ord("!")])
+    assert view[2] == ord("!")
+    assert memoryview(simulator)[0x3000] == 0xE002
+
+
+def test_memory_view_numpy():
+    numpy = pytest.importorskip("numpy")
+    simulator = load(HELLO)
+    words = numpy.frombuffer(simulator.memory_view(0x3000, 0x3006), numpy.uint16)
+    assert words.tolist() == HELLO
+    assert not words.flags.writeable
+
+
+def test_load_object(tmp_path):
+    path = tmp_path / "hello.obj"
+    with open(path, "wb") as file:
+        write_object(file, 0x3000, HELLO)
+    simulator = Simulator()
+    assert simulator.load_object(path) == 0x3000
+    assert simulator.memory_view(0x3000, 0x3006).tolist() == HELLO
+    assert simulator.run().exit_reason == ExitReason.HALT
+    assert simulator.output == b"Hi"
+
+    (tmp_path / "odd.obj").write_bytes(b"\x30\x00\x01")
+    with pytest.raises(ValueError):
+        simulator.load_object(tmp_path / "odd.obj")
+    (tmp_path / "long.obj").write_bytes(b"\xFF\xFF\x00\x01\x00\x02")
+    with pytest.raises(ValueError):
+        simulator.load_object(tmp_path / "long.obj")
+    (tmp_path / "empty.obj").write_bytes(b"\x40\x00")
+    assert simulator.load_object(tmp_path / "empty.obj") == 0x4000
+    assert simulator.memory_view(0x3000, 0x3006).tolist() == HELLO
@@ -0,0 +1,149 @@
+import dataclasses
+import tracemalloc
+
+from lc3_py.simulator.simulator import Simulator, ExitReason
+
+
+PROGRAM = [
+    0xF020, # GETC
+    0x5260, # AND R1, R1, #0
+    0x1265, # ADD R1, R1, #5
+    0x728A, # LOOP STR R1, R2, #10
+    0xF021, # OUT
+    0x127F, # ADD R1, R1, #-1
+    0x03FC, # BRp LOOP
+    0xF025, # HALT
+]
+
+
+def state(simulator: Simulator):
+    return (
+        simulator.registers, simulator.output, simulator.instruction_count, simulator.halted,
+        simulator.snapshot().memory.tobytes())
+
+
+def run_recording(checkpoint_interval: int):
+    simulator = Simulator()
+    simulator.load(0x3000, PROGRAM)
+    simulator.feed(b"\x30")
+    simulator.set_register(2, 0x3000)
+    simulator.enable_undo(checkpoint_interval)
+    states = [state(simulator)]
+    while simulator.step() is None:
+        states.append(state(simulator))
+    states.append(state(simulator))
+    return simulator, states
+
+
+def test_step_back_one_at_a_time():
+    simulator, states = run_recording(checkpoint_interval=1000)
+    assert simulator.halted
+    for expected in reversed(states[:-1]):
+        assert simulator.step_back() == 1
+        assert state(simulator) == expected
+    assert simulator.step_back() == 0
+
+
+def test_step_back_across_checkpoints():
+    for interval in (1, 3, 7, 1000):
+        simulator, states = run_recording(checkpoint_interval=interval)
+        assert simulator.step_back(5) == 5
+        assert state(simulator) == states[-6]
+        assert simulator.step_back(100) == len(states) - 6
+        assert state(simulator) == states[0]
+
+
+def test_run_back_to_then_forward():
+    simulator, states = run_recording(checkpoint_interval=4)
+    undone = simulator.run_back_to(0x3003)
+    assert simulator.pc == 0x3003
+    assert state(simulator) == states[-1 - undone]
+    assert simulator.run().exit_reason == ExitReason.HALT
+    assert state(simulator) == states[-1]
+
+
+TRAP_PROGRAM = [
+    0x2209, # LD R1, ENABLE
+    0xB209, # STI R1, TMR_ADDRESS
+    0x2209, # LD R1, INTERVAL
+    0xB209, # STI R1, TMI_ADDRESS
+    0xF026, # LOOP TRAP x26
+    0x14A1, # ADD R2, R2, #1
+    0x0FFD, # BRnzp LOOP
+    0x0000,
+    0x0000,
+    0x0000,
+    0x4000, # ENABLE
+    0xFE08, # TMR_ADDRESS
+    0x0007, # INTERVAL
+    0xFE0A, # TMI_ADDRESS
+]
+
+
+def full_state(simulator: Simulator):
+    return dataclasses.astuple(simulator.snapshot())
+
+
+def trap_heavy_simulator() -> Simulator:
+    simulator = Simulator()
+    simulator.load(0x0026, [0x0200])
+    simulator.load(0x0200, [0x1B61, 0x8000]) # ADD R5, R5, #1; RTI
+    simulator.load(0x0181, [0x0210])
+    simulator.load(0x0210, [0xA601, 0x8000, 0xFE08]) # LDI R3, TMR_ADDRESS; RTI
+    simulator.load(0x3000, TRAP_PROGRAM)
+    return simulator
+
+
+def test_step_back_through_traps_and_interrupts():
+    for interval in (1, 5, 1000):
+        simulator = trap_heavy_simulator()
+        simulator.enable_undo(interval)
+        snapshots = [full_state(simulator)]
+        for _ in range(200):
+            assert simulator.step() is None
+            snapshots.append(full_state(simulator))
+        assert simulator.get_register(5) > 0 and simulator.get_register(3) & 0x4000
+        for expected in reversed(snapshots[:-1]):
+            assert simulator.step_back() == 1
+            assert full_state(simulator) == expected
+        for _ in range(200):
+            simulator.step()
+        assert full_state(simulator) == snapshots[-1]
+        assert simulator.step_back(150) == 150
+        assert full_state(simulator) == snapshots[50]
+
+
+def test_trap_heavy_log_stays_small():
+    simulator = trap_heavy_simulator()
+    simulator.enable_undo()
+    tracemalloc.start()
+    try:
+        simulator.run(budget=30000)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert simulator.get_register(5) > 4000
+    assert size < 8 * 1024 * 1024
+
+
+def test_step_back_after_budgeted_runs():
+    reference = trap_heavy_simulator()
+    states = [full_state(reference)]
+    for _ in range(120):
+        reference.step()
+        states.append(full_state(reference))
+    for budget in (1, 5, 7, 8):
+        simulator = trap_heavy_simulator()
+        simulator.enable_undo(5)
+        while simulator.instruction_count + budget < len(states):
+            simulator.run(budget=budget)
+            assert full_state(simulator) == states[simulator.instruction_count]
+        assert simulator.step_back(1) == 1
+        assert full_state(simulator) == states[simulator.instruction_count]
+        simulator.step()
+        assert full_state(simulator) == states[simulator.instruction_count]
+        simulator.run_back_to(0x3005)
+        assert full_state(simulator) == states[simulator.instruction_count]
+        simulator.run(budget=budget)
+        assert simulator.step_back(simulator.instruction_count) > 0
+        assert full_state(simulator) == states[0]
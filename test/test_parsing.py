@@ -1,4 +1,6 @@
 from lc3_py import parsing as p
+import pickle
+import pytest
 from lc3_py.type_additions import iserr
 import operator as op
 
@@ -113,3 +115,98 @@ def test_expression():
 
 
     
+
+def test_index_to_position_converter():
+    converter = p.IndexToPositionConverter("ab\ncd\r\nef\rg")
+    assert converter.get(0) == p.Position(line=1, char=0)
+    assert converter.get(4) == p.Position(line=2, char=1)
+    assert converter.get(5) == p.Position(line=2, char=2)
+    assert converter.get(7) == p.Position(line=3, char=0)
+    assert converter.get(10) == p.Position(line=4, char=0)
+
+def test_errors_are_formatted_lazily():
+    error = p.string("bob").parse("bill")
+    assert isinstance(error, p.Expected) and error.start == 0
+    assert error.error == "expected 'bob'"
+    error = p.regex(r"\d+").map(int).parse("x")
+    assert iserr(error) and error.error == r"expected r'\d+'"
+
+def test_furthest_failure():
+    comb = (p.string("a") + p.string("b")) | (p.string("a") + p.string("c")) | p.string("d")
+    error = comb.parse("ax")
+    assert iserr(error) and error.error == "expected 'd'"
+    error = comb.parse("ax", furthest_failure=True)
+    assert isinstance(error, p.ErrToken) and error.start == 1 and error.error == "expected one of 'b', 'c'"
+    error = p.string("a").parse_many("aab", furthest_failure=True)
+    assert isinstance(error, p.ErrToken) and error.start == 2 and error.error == "expected 'a'"
+    error = p.string("a").parse("aa", furthest_failure=True)
+    assert isinstance(error, p.ErrToken) and error.start == 1 and error.error == "expected end of file"
+
+def test_furthest_failure_keeps_other_errors():
+    def reject(value: str):
+        raise RuntimeError("rejected")
+    rejecting = p.regex(r"^\d+").map(reject)
+    error = rejecting.parse("12", furthest_failure=True)
+    assert isinstance(error, p.ErrToken) and error.start == 2 and error.error == "rejected"
+    error = (p.string("x") | rejecting).parse("12", furthest_failure=True)
+    assert isinstance(error, p.ErrToken) and error.start == 2 and error.error == "rejected"
+    error = p.forward(str, str).parse("a", furthest_failure=True)
+    assert isinstance(error, p.ErrToken) and error.start == 0 and error.error == "undefined forward combinator"
+
+def test_profiling():
+    number = p.regex(r"^\d+")
+    word = p.regex(r"^[a-z]+")
+    grammar = (number | word).postskip(p.string(" "))
+    with p.profiling() as profiler:
+        assert grammar.parse_many("12 ab 3") == ["12", "ab", "3"]
+    profiles = {profile.name: profile for profile in profiler.report()}
+    assert (profiles[number.name].calls, profiles[number.name].successes, profiles[number.name].failures) == (4, 2, 2)
+    assert (profiles[word.name].calls, profiles[word.name].successes) == (2, 1)
+    outer = profiles[grammar.name]
+    assert outer.cumulative_seconds >= outer.self_seconds
+    assert outer.cumulative_seconds >= sum(profile.self_seconds for profile in profiles.values()) - 1e-9
+    by_calls = [profile.calls for profile in profiler.report(sort="calls")]
+    assert by_calls == sorted(by_calls, reverse=True) and len(profiler.report(limit=2)) == 2
+    assert "calls" in p.format_profile(profiler.report())
+
+    import io
+    collapsed = io.StringIO()
+    profiler.write_collapsed(collapsed)
+    lines = collapsed.getvalue().splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith(f"{grammar.name};{(number | word).name};{number.name} ") for line in lines)
+
+    with p.profiling() as inner:
+        grammar.parse("1")
+    assert inner is not profiler and profiles[number.name].calls == 4
+
+
+def _first(seq: p.AdvancingSequence[str]):
+    return seq.advance(1), seq[0]
+
+first = p.combinator(_first)
+
+@p.combinator("first character")
+def decorated_first(seq: p.AdvancingSequence[str]):
+    return seq.advance(1), seq[0]
+
+def test_pickle_module_level_combinators():
+    loaded = pickle.loads(pickle.dumps(first))
+    assert isinstance(loaded, p.Combinator) and loaded.name == "_first"
+    assert loaded.parse("a") == "a"
+    assert pickle.loads(pickle.dumps(decorated_first)) is decorated_first
+
+def test_pickle():
+    nested = p.forward(str, str, "Nested")
+    nested.define(p.regex(r"^\d+") | (p.string("(") + nested + p.string(")")))
+    loaded = pickle.loads(pickle.dumps(nested))
+    assert loaded.parse("((12))") == "((12))"
+    assert iserr(loaded.parse("((12)"))
+    assert loaded.definition.recipe[1][1].recipe[1][0].recipe[1][1] is loaded
+
+    assert pickle.loads(pickle.dumps(p.regex(r"^\d+").map(int))).parse("42") == 42
+    @p.combinator
+    def local(seq: p.AdvancingSequence[str]):
+        return seq.advance(1), seq[0]
+    with pytest.raises(TypeError):
+        pickle.dumps(local.many())
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+_BUDGET_MICROSECONDS = 150_000
+"""The most importing lc3_py's own modules may take for assembling, not counting the standard library"""
+
+_DEFERRED = ["numpy", "json", "tracemalloc", "multiprocessing", "asyncio", "lc3_py.simulator.simulator", "lc3_py.parsing"]
+
+
+def _import_times(code: str) -> tuple[dict[str, int], str]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    self_times: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, _, name = line.removeprefix("import time:").split("|")
+        self_times[name.strip()] = int(self_time)
+    return self_times, process.stdout
+
+
+def test_assembler_startup():
+    self_times, output = _import_times(
+        "import lc3_py.assembler.encoder, lc3_py.simulator\n"
+        "from lc3_py.assembler import lexer\n"
+        "print(lexer._match_functions is None)")
+    assert output.split() == ["True"]
+    assert not [name for name in _DEFERRED if name in self_times]
+    assert sum(time for name, time in self_times.items() if name.startswith("lc3_py")) < _BUDGET_MICROSECONDS
+
+
+def test_lazy_names():
+    _, output = _import_times(
+        "import sys, lc3_py.assembler, lc3_py.simulator\n"
+        "print(lc3_py.assembler.assemble_lc3.__module__, lc3_py.simulator.Simulator.__module__)\n"
+        "print('numpy' in sys.modules)")
+    assert output.split() == ["lc3_py.assembler.encoder", "lc3_py.simulator.simulator", "False"]